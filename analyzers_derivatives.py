@@ -2,7 +2,7 @@
 # DERIVATIVES ANALYZER: Futures Basis + Options Skew + OI Delta
 # ===========================================================================
 
-from typing import Optional, Tuple, Dict, Any, List
+from typing import Optional, Tuple, Dict, Any, List, Union
 from decimal import Decimal
 from datetime import datetime, timedelta
 import numpy as np
@@ -96,11 +96,11 @@ class DerivativesAnalyzer:
     
     def calculate_gex(
         self,
-        strikes: List[float],
-        types: List[str],
-        expiry_years: List[float],
-        ivs: List[float],
-        open_interest: List[float],
+        strikes: Union[List[float], np.ndarray],
+        types: Union[List[str], np.ndarray],
+        expiry_years: Union[List[float], np.ndarray],
+        ivs: Union[List[float], np.ndarray],
+        open_interest: Union[List[float], np.ndarray],
         underlying_price: float,
         avg_daily_volume: Optional[float] = None  # NEW: Можно передать снаружи
     ):
@@ -119,11 +119,11 @@ class DerivativesAnalyzer:
         - Результат: GammaProfile (domain model)
         
         Args:
-            strikes: Список страйков
+            strikes: Список (или float64 ndarray) страйков
             types: Список типов ('C' или 'P')
-            expiry_years: Список времени до экспирации в годах
-            ivs: Список Implied Volatility (decimal, например 0.65)
-            open_interest: Список Open Interest
+            expiry_years: Список (или ndarray) времени до экспирации в годах
+            ivs: Список (или ndarray) Implied Volatility (decimal, например 0.65)
+            open_interest: Список (или ndarray) Open Interest
             underlying_price: Цена базового актива (спот)
         
         Returns:
@@ -147,50 +147,46 @@ class DerivativesAnalyzer:
         """
         from domain import GammaProfile
         
-        if not strikes or len(strikes) == 0:
+        if strikes is None or len(strikes) == 0:
             return None
         
         # Конвертируем в numpy arrays для векторизации
-        S = np.array([underlying_price] * len(strikes))  # Spot price
-        K = np.array(strikes)  # Strike prices
-        T = np.array(expiry_years)  # Time to expiry (years)
-        sigma = np.array(ivs)  # Implied Volatility
+        # WHY: np.asarray не копирует, если уже пришёл float64 ndarray
+        S = float(underlying_price)  # Spot price (скаляр, broadcast)
+        K = np.asarray(strikes, dtype=np.float64)  # Strike prices
+        T = np.asarray(expiry_years, dtype=np.float64)  # Time to expiry (years)
+        sigma = np.asarray(ivs, dtype=np.float64)  # Implied Volatility
+        sqrt_T = np.sqrt(T)
         
         # Black-Scholes: d1 = (ln(S/K) + 0.5*σ²*T) / (σ*√T)
-        d1 = (np.log(S / K) + (0.5 * sigma**2) * T) / (sigma * np.sqrt(T))
+        d1 = (np.log(S / K) + (0.5 * sigma**2) * T) / (sigma * sqrt_T)
         
         # Gamma = N'(d1) / (S * σ * √T)
         # где N'(d1) - плотность стандартного нормального распределения
-        gamma = norm.pdf(d1) / (S * sigma * np.sqrt(T))
+        gamma = norm.pdf(d1) / (S * sigma * sqrt_T)
         
         # GEX = Gamma * OI * S² (removing * 0.01 multiplier)
         # WHY: The 0.01 was causing 100x underestimation
-        oi_array = np.array(open_interest)
+        oi_array = np.asarray(open_interest, dtype=np.float64)
         gex_array = gamma * oi_array * (S**2)
         
         # Инвертируем Put GEX (умножаем на -1)
         # WHY: Поддержка как uppercase 'P' так и lowercase 'put'
-        for i, opt_type in enumerate(types):
-            if opt_type.upper() == 'P' or opt_type.lower() == 'put':
-                gex_array[i] *= -1
+        opt_types = np.char.lower(np.asarray(types, dtype=str))
+        gex_array[(opt_types == 'p') | (opt_types == 'put')] *= -1
         
-        # Агрегация по страйкам
-        strike_gex = {}
-        for i, strike in enumerate(strikes):
-            if strike not in strike_gex:
-                strike_gex[strike] = 0.0
-            strike_gex[strike] += gex_array[i]
+        # Агрегация по страйкам (один проход bincount вместо dict)
+        unique_strikes, strike_idx = np.unique(K, return_inverse=True)
+        strike_gex = np.bincount(strike_idx, weights=gex_array, minlength=unique_strikes.size)
         
         # Total GEX
-        total_gex = sum(strike_gex.values())
+        total_gex = float(strike_gex.sum())
         
         # Call Wall: страйк с максимальным положительным GEX
-        call_strikes = {k: v for k, v in strike_gex.items() if v > 0}
-        call_wall = max(call_strikes.keys(), key=lambda k: call_strikes[k]) if call_strikes else None
+        call_wall = float(unique_strikes[np.argmax(strike_gex)]) if (strike_gex > 0).any() else None
         
         # Put Wall: страйк с максимальным отрицательным GEX (по абсолютному значению)
-        put_strikes = {k: v for k, v in strike_gex.items() if v < 0}
-        put_wall = min(put_strikes.keys(), key=lambda k: put_strikes[k]) if put_strikes else None
+        put_wall = float(unique_strikes[np.argmin(strike_gex)]) if (strike_gex < 0).any() else None
         
         # === GEMINI FIX: GEX Normalization ===
         # Рассчитываем total_gex_normalized = total_gex / ADV_20d
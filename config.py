@@ -1,8 +1,11 @@
 from dataclasses import dataclass
 from decimal import Decimal
-from typing import Dict
+from typing import Dict, Final
 
-@dataclass
+# WHY: frozen + slots - конфиги общие для всех LocalOrderBook (передаются по ссылке).
+# Мутация одного экземпляра протекла бы во все стаканы этого символа.
+# Для кастомных параметров используй dataclasses.replace(config, ...).
+@dataclass(frozen=True, slots=True)
 class AssetConfig:
     """Конфигурация для конкретного актива"""
     symbol: str
@@ -81,7 +84,7 @@ class AssetConfig:
 
 # --- КОНФИГУРАЦИИ ---
 
-BTC_CONFIG = AssetConfig(
+BTC_CONFIG: Final = AssetConfig(
     symbol="BTCUSDT",
     # Tech
     dust_threshold=Decimal("0.0001"), # ~$10
@@ -118,7 +121,7 @@ BTC_CONFIG = AssetConfig(
     vpin_noise_threshold=0.3               # WHY: Стандарт из академической литературы
 )
 
-ETH_CONFIG = AssetConfig(
+ETH_CONFIG: Final = AssetConfig(
     symbol="ETHUSDT",
     # Tech
     dust_threshold=Decimal("0.01"),   # ~$30
@@ -156,7 +159,7 @@ ETH_CONFIG = AssetConfig(
 )
 
 # Для примера: SOL (чтобы понять зачем нужны форматы)
-SOL_CONFIG = AssetConfig(
+SOL_CONFIG: Final = AssetConfig(
     symbol="SOLUSDT",
     dust_threshold=Decimal("0.1"),
     price_display_format="{:,.3f}",   # 145.235 (больше точности)
@@ -186,11 +189,12 @@ SOL_CONFIG = AssetConfig(
     vpin_noise_threshold=0.25              # WHY: Ниже порог для волатильного актива
 )
 
-CONFIG_REGISTRY = {
+CONFIG_REGISTRY: Final[Dict[str, AssetConfig]] = {
     "BTCUSDT": BTC_CONFIG,
     "ETHUSDT": ETH_CONFIG,
     "SOLUSDT": SOL_CONFIG
 }
 
 def get_config(symbol: str) -> AssetConfig:
+    # WHY: Возвращаем общий (immutable) экземпляр без копирования - O(1) на каждый стакан
     return CONFIG_REGISTRY.get(symbol, BTC_CONFIG)
\ No newline at end of file
@@ -6,6 +6,40 @@ WHY: Categorization for refactoring triage
 """
 import pytest
 
+from config import get_config
+
+
+@pytest.fixture(scope="session")
+def btc_config():
+    """WHY: Общий BTCUSDT AssetConfig на сессию (immutable, безопасно шарить)"""
+    return get_config("BTCUSDT")
+
+
+@pytest.fixture(scope="session")
+def sol_config():
+    """WHY: Общий SOLUSDT AssetConfig на сессию (immutable, безопасно шарить)"""
+    return get_config("SOLUSDT")
+
+
+def pytest_addoption(parser):
+    """WHY: Тесты с реальными HTTP запросами (Binance/Deribit) выключены по умолчанию"""
+    parser.addoption(
+        "--run-network",
+        action="store_true",
+        default=False,
+        help="Run tests marked 'network' against live exchange APIs and databases"
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    """WHY: Без --run-network пропускаем network-тесты (нет сети в CI, флаки, секунды на RTT)"""
+    if config.getoption("--run-network"):
+        return
+    skip_network = pytest.mark.skip(reason="Network test: use --run-network to enable")
+    for item in items:
+        if "network" in item.keywords:
+            item.add_marker(skip_network)
+
 
 def pytest_configure(config):
     """Register custom markers"""
@@ -26,3 +60,16 @@ def pytest_configure(config):
         "markers",
         "infrastructure: Critical infrastructure tests (fix immediately)"
     )
+    
+    # Тесты с живыми запросами к биржам и БД (включаются через --run-network)
+    config.addinivalue_line(
+        "markers",
+        "network: Tests that hit live services - exchange REST APIs, local Postgres (skipped without --run-network)"
+    )
+    
+    # pytest-xdist: группировка тестов на одном воркере (--dist loadgroup).
+    # Регистрируем здесь, чтобы маркер не давал warning без установленного xdist.
+    config.addinivalue_line(
+        "markers",
+        "xdist_group(name): Run tests of the group on the same xdist worker"
+    )
@@ -1,14 +1,16 @@
 from pydantic import BaseModel, Field, ConfigDict
 from typing import Dict, List, Tuple, Optional
 from decimal import Decimal
-from datetime import datetime
+from datetime import datetime, date, timedelta, timezone
 from dataclasses import dataclass
 from sortedcontainers import SortedDict
 from datetime import datetime
 from typing import Dict, List, Tuple, Optional # Добавьте List
 from collections import deque
+from itertools import islice
 from enum import Enum
 import math  # WHY: For exp() in volume-based OFI anti-spoofing
+import functools
 
 # WHY: Импорт конфигурации для мульти-токен поддержки (Task: Multi-Asset Support)
 from config import AssetConfig, get_config
@@ -60,23 +62,35 @@ class GammaProfile(BaseModel):
         Returns:
             datetime: Ближайшая пятница 08:00 UTC
         """
-        from datetime import timezone, timedelta
-        
         now = datetime.now(timezone.utc)
         
-        # weekday(): 0=Monday, 1=Tuesday, ..., 4=Friday
-        # Вычисляем дней до пятницы
-        days_ahead = (4 - now.weekday()) % 7
-        
-        # Если сегодня пятница (days_ahead=0) и уже прошло 08:00 → берем следующую пятницу
-        if days_ahead == 0 and now.hour >= 8:
-            days_ahead = 7
-        
-        # Находим дату пятницы
-        next_friday = now + timedelta(days=days_ahead)
-        
-        # Устанавливаем время 08:00:00 UTC
-        return next_friday.replace(hour=8, minute=0, second=0, microsecond=0)
+        # WHY: Результат меняется только при смене UTC-дня (или в пятницу после 08:00)
+        return _options_expiry_for(now.date(), now.hour >= 8)
+
+
+@functools.lru_cache(maxsize=4)
+def _options_expiry_for(day: date, past_expiry_hour: bool) -> datetime:
+    """
+    WHY: Кэш для GammaProfile.get_next_options_expiry() (вызывается на каждый GEX тик).
+    
+    Args:
+        day: Текущая дата (UTC)
+        past_expiry_hour: True если текущее время >= 08:00 UTC
+    
+    Returns:
+        datetime: Ближайшая пятница 08:00 UTC
+    """
+    # weekday(): 0=Monday, 1=Tuesday, ..., 4=Friday
+    # Вычисляем дней до пятницы
+    days_ahead = (4 - day.weekday()) % 7
+    
+    # Если сегодня пятница (days_ahead=0) и уже прошло 08:00 → берем следующую пятницу
+    if days_ahead == 0 and past_expiry_hour:
+        days_ahead = 7
+    
+    # Пятница 08:00:00 UTC
+    next_friday = day + timedelta(days=days_ahead)
+    return datetime(next_friday.year, next_friday.month, next_friday.day, 8, tzinfo=timezone.utc)
 
 class PriceLevel(BaseModel):
     price: Decimal
@@ -474,20 +488,10 @@ class IcebergLevel(BaseModel):
             return 0.0  # Нет ликвидности в стакане
         
         # 2. Суммируем видимую ликвидность топ-N уровней
-        visible_volume = Decimal('0')
-        
-        if self.is_ask:
-            # ASK: берём самые дешёвые (с начала)
-            for i, (price, qty) in enumerate(book_side.items()):
-                if i >= depth:
-                    break
-                visible_volume += qty
-        else:
-            # BID: берём самые дорогие (с конца)
-            for i, (price, qty) in enumerate(reversed(book_side.items())):
-                if i >= depth:
-                    break
-                visible_volume += qty
+        # WHY: SortedDict уже отсортирован → берём срез O(depth) через islice,
+        # ASK: самые дешёвые (с начала), BID: самые дорогие (с конца)
+        quantities = book_side.values() if self.is_ask else reversed(book_side.values())
+        visible_volume = sum(islice(quantities, depth), Decimal('0'))
         
         if visible_volume == 0:
             return 0.0
@@ -1016,6 +1020,9 @@ class LocalOrderBook(BaseModel):
     # Pre-allocated буферы для переиспользования (избегаем 2000 аллокаций/сек)
     previous_bid_snapshot: Dict[Decimal, Decimal] = Field(default_factory=dict)
     previous_ask_snapshot: Dict[Decimal, Decimal] = Field(default_factory=dict)
+    # WHY: True после apply_snapshot() до первого apply_update() - baseline OFI только что
+    # совпал со стаканом, calculate_ofi() отдаёт 0.0 без обхода книги
+    _ofi_baseline_invalid: bool = False
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
@@ -1043,12 +1050,9 @@ class LocalOrderBook(BaseModel):
         # WHY: CRITICAL FIX (Task: Reconnect Bug Fix) - Gemini Phase 1.1
         # При reconnect сбрасываем старое состояние OFI
         # Иначе calculate_ofi() будет сравнивать новый стакан со старым (до разрыва)
-        # === DOUBLE BUFFERING: Используем clear() вместо = None ===
-        self.previous_bid_snapshot.clear()
-        self.previous_ask_snapshot.clear()
-        
-        # Сохраняем новое начальное состояние
+        # _save_book_snapshot() сам очищает буферы (clear()) и заполняет их новым стаканом
         self._save_book_snapshot()
+        self._ofi_baseline_invalid = True
 
     def apply_update(self, update: OrderBookUpdate) -> bool:
         """
@@ -1070,6 +1074,7 @@ class LocalOrderBook(BaseModel):
         # WHY: Сохраняем снапшот ДО применения update (для OFI) - Task: OFI Implementation
         # Это должно быть ДО _process_side!
         self._save_book_snapshot()
+        self._ofi_baseline_invalid = False
 
         self._process_side(self.bids, update.bids)
         self._process_side(self.asks, update.asks)
@@ -1307,6 +1312,10 @@ class LocalOrderBook(BaseModel):
         ask_icebergs = sorted([lvl for lvl in active if lvl.is_ask], 
                              key=lambda x: x.price)
         
+        # WHY: Толеранс парсим в Decimal один раз - в цикле сравнение через умножение
+        # (diff <= prev * tol) вместо деления и float() на каждую пару уровней
+        tolerance = Decimal(str(tolerance_pct))
+        
         # Кластеризуем каждую сторону
         for is_ask, icebergs in [(False, bid_icebergs), (True, ask_icebergs)]:
             if not icebergs:
@@ -1319,10 +1328,8 @@ class LocalOrderBook(BaseModel):
                 prev_price = icebergs[i-1].price
                 curr_price = icebergs[i].price
                 
-                # Проверяем близость
-                price_diff_pct = float(abs(curr_price - prev_price) / prev_price)
-                
-                if price_diff_pct <= tolerance_pct:
+                # Проверяем близость (список отсортирован - curr_price >= prev_price)
+                if curr_price - prev_price <= prev_price * tolerance:
                     # Добавляем в текущий кластер
                     current_cluster.append(icebergs[i])
                 else:
@@ -1411,9 +1418,16 @@ class LocalOrderBook(BaseModel):
             bids: New snapshot bids [(price, qty), ...]
             asks: New snapshot asks [(price, qty), ...]
         """
-        # WHY: Convert snapshot to dict for O(1) lookup
-        snapshot_bid_prices = {price for price, qty in bids if qty > self.config.dust_threshold}
-        snapshot_ask_prices = {price for price, qty in asks if qty > self.config.dust_threshold}
+        # WHY: Convert snapshot to set for O(1) lookup
+        # Порог читаем один раз - не lookup self.config на каждый уровень снапшота
+        dust = self.config.dust_threshold
+        snapshot_bid_prices = {price for price, qty in bids if qty > dust}
+        snapshot_ask_prices = {price for price, qty in asks if qty > dust}
+        
+        # WHY: Mid price и время отмены одинаковы для всех айсбергов этого resync -
+        # считаем один раз, а не на каждый отменённый уровень
+        mid = self.get_mid_price()
+        cancelled_at = datetime.now()
         
         # WHY: Iterate through active icebergs and check if they still exist
         for price, iceberg in self.active_icebergs.items():
@@ -1421,42 +1435,24 @@ class LocalOrderBook(BaseModel):
             if iceberg.status != IcebergStatus.ACTIVE:
                 continue
             
-            # Check BID icebergs
-            if not iceberg.is_ask:
-                # If price not in snapshot OR volume is dust → mark as CANCELLED
-                if price not in snapshot_bid_prices:
-                    iceberg.status = IcebergStatus.CANCELLED
-                    iceberg.last_update_time = datetime.now()
-                    
-                    # WHY: Store cancellation context for spoofing analysis
-                    mid = self.get_mid_price()
-                    if mid:
-                        distance_pct = abs((mid - price) / price * 100)
-                        iceberg.cancellation_context = CancellationContext(
-                            mid_price_at_cancel=mid,
-                            distance_from_level_pct=distance_pct,
-                            price_velocity_5s=Decimal("0"),  # Not tracked here
-                            moving_towards_level=False,
-                            volume_executed_pct=Decimal("0")  # Unknown after resync
-                        )
+            # If price not in snapshot of its side OR volume is dust → mark as CANCELLED
+            snapshot_prices = snapshot_ask_prices if iceberg.is_ask else snapshot_bid_prices
+            if price in snapshot_prices:
+                continue
             
-            # Check ASK icebergs
-            else:
-                if price not in snapshot_ask_prices:
-                    iceberg.status = IcebergStatus.CANCELLED
-                    iceberg.last_update_time = datetime.now()
-                    
-                    # Store context
-                    mid = self.get_mid_price()
-                    if mid:
-                        distance_pct = abs((price - mid) / price * 100)
-                        iceberg.cancellation_context = CancellationContext(
-                            mid_price_at_cancel=mid,
-                            distance_from_level_pct=distance_pct,
-                            price_velocity_5s=Decimal("0"),
-                            moving_towards_level=False,
-                            volume_executed_pct=Decimal("0")
-                        )
+            iceberg.status = IcebergStatus.CANCELLED
+            iceberg.last_update_time = cancelled_at
+            
+            # WHY: Store cancellation context for spoofing analysis
+            if mid:
+                distance_pct = abs((mid - price) / price * 100)
+                iceberg.cancellation_context = CancellationContext(
+                    mid_price_at_cancel=mid,
+                    distance_from_level_pct=distance_pct,
+                    price_velocity_5s=Decimal("0"),  # Not tracked here
+                    moving_towards_level=False,
+                    volume_executed_pct=Decimal("0")  # Unknown after resync
+                )
     
     def get_iceberg_at_price(self, price: Decimal, is_ask: bool) -> Optional[IcebergLevel]:
         """
@@ -1532,11 +1528,15 @@ class LocalOrderBook(BaseModel):
         Использует shallow copy только для необходимых уровней.
         
         === OPTIMIZATION (Task: Gemini Phase 2.1) ===
-        Используем SortedDict.peekitem() вместо sorted(keys) для O(1) доступа.
+        Используем отсортированность SortedDict вместо sorted(keys).
         
         === UPDATE (Task: Gemini Phase 2.2) ===
         Теперь использует config.ofi_depth по умолчанию.
         
+        === OPTIMIZATION (Snapshot без копий) ===
+        Буферы переиспользуются (clear()), обход топ-N через islice по ключам
+        вместо peekitem(i) на каждый уровень. Полного dict.copy() стакана нет.
+        
         Args:
             depth: Количество уровней для сохранения. Если None - берётся config.ofi_depth
         """
@@ -1544,27 +1544,22 @@ class LocalOrderBook(BaseModel):
         if depth is None:
             depth = self.config.ofi_depth
         
-        # WHY: Используем peekitem() - O(1) вместо sorted() - O(N log N)
-        # peekitem(-1) = последний (лучший bid)
-        # peekitem(0) = первый (лучший ask)
+        # WHY: Идём по отсортированным ключам через islice - O(depth) одним проходом.
+        # peekitem(i) на каждый уровень заново индексирует SortedList (~4x медленнее)
         
         # === DOUBLE BUFFERING: Очищаем буферы вместо создания новых ===
         self.previous_bid_snapshot.clear()  # ✅ Переиспользование памяти
         self.previous_ask_snapshot.clear()  # ✅ Нет новой аллокации!
         
-        # Сохраняем топ-N бидов (самые дорогие)
-        n_bids = min(depth, len(self.bids))
-        for i in range(n_bids):
-            # peekitem(-1) = best, peekitem(-2) = 2nd best, ...
-            price, qty = self.bids.peekitem(-(i + 1))
-            self.previous_bid_snapshot[price] = qty
+        # Сохраняем топ-N бидов (самые дорогие): reversed = от лучшего bid вниз
+        bids = self.bids
+        for price in islice(reversed(bids), depth):
+            self.previous_bid_snapshot[price] = bids[price]
         
         # Сохраняем топ-N асков (самые дешевые)
-        n_asks = min(depth, len(self.asks))
-        for i in range(n_asks):
-            # peekitem(0) = best, peekitem(1) = 2nd best, ...
-            price, qty = self.asks.peekitem(i)
-            self.previous_ask_snapshot[price] = qty
+        asks = self.asks
+        for price in islice(asks, depth):
+            self.previous_ask_snapshot[price] = asks[price]
     
     def calculate_ofi(self, depth: int = None, use_weighted: bool = False) -> float:
         """
@@ -1609,6 +1604,11 @@ class LocalOrderBook(BaseModel):
         Returns:
             float: OFI значение (положительное = давление покупателей)
         """
+        # WHY: Сразу после snapshot (reconnect) изменений ещё нет - O(1) вместо
+        # сортировки всего стакана. Гарантирует отсутствие "гигантского" OFI структурно
+        if self._ofi_baseline_invalid:
+            return 0.0
+        
         # WHY: Если depth не передан - берём из config
         if depth is None:
             depth = self.config.ofi_depth
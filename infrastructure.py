@@ -12,7 +12,7 @@ from domain import OrderBookUpdate, TradeEvent, GammaProfile
 from abc import ABC, abstractmethod
 import time
 from heapq import heappush, heappop
-from typing import List, Tuple, Any
+from typing import List, Tuple, Any, Callable
 from collections import deque
 import statistics
 
@@ -123,9 +123,16 @@ class ReorderingBuffer:
     Решает проблему Race Condition, когда depthUpdate приходит раньше aggTrade.
     Источник: Часть 2.2 вашего документа [cite: 98-99].
     """
-    def __init__(self, delay_ms: int = 50):
+    def __init__(self, delay_ms: int = 50, clock: Callable[[], float] = time.time):
+        """
+        Args:
+            delay_ms: Окно созревания событий
+            clock: Источник локального времени в секундах (тесты передают виртуальные часы)
+        """
         self.delay_sec = delay_ms / 1000.0
-        self.buffer: List[Tuple[float, int, Any]] = [] # (event_time, priority, item)
+        self._clock = clock
+        # WHY: min-heap - counter разрывает ничьи, чтобы heapq не сравнивал сами события
+        self.buffer: List[Tuple[float, int, int, Any]] = [] # (event_time, priority, counter, item)
         self.counter = 0
         
     def add(self, item, event_time: int, priority: int):
@@ -161,24 +168,20 @@ class ReorderingBuffer:
         Returns:
             List событий старше delay_sec, отсортированных по (event_time, priority)
         """
-        now = time.time()  # Текущее локальное время в секундах
+        now = self._clock()  # Текущее локальное время в секундах
         cutoff_time = now - self.delay_sec  # Граница "созревания"
         
         ready_items = []
         
+        # WHY: Локальные ссылки - цикл крутится на каждом тике, без распаковки кортежа
+        # и повторного поиска атрибутов
+        buffer = self.buffer
+        append = ready_items.append
+        
         # Извлекаем события старше cutoff_time
-        while self.buffer:
-            # Проверяем самый старый элемент (не удаляя)
-            event_time, priority, counter, item = self.buffer[0]
-            
-            # Если событие старше cutoff → извлекаем
-            if event_time <= cutoff_time:
-                heappop(self.buffer)  # Удаляем из буфера
-                ready_items.append(item)
-            else:
-                # Событие слишком свежее → прерываем цикл
-                # (heap отсортирован, все остальные тоже свежие)
-                break
+        # (heap отсортирован: как только голова свежая - все остальные тоже свежие)
+        while buffer and buffer[0][0] <= cutoff_time:
+            append(heappop(buffer)[3])
         
         return ready_items
 
@@ -663,6 +666,20 @@ class DeribitInfrastructure:
 # HELPER FUNCTIONS: Volume & Market Data
 # ===========================================================================
 
+def _adv_from_klines(klines: List[list]) -> float:
+    """
+    WHY: Чистая математика ADV отделена от IO (векторно через NumPy).
+    
+    Klines format: [timestamp, open, high, low, close, volume, ...]
+    USD объём свечи = volume (индекс 5) * close (индекс 4).
+    
+    Returns:
+        Средний дневной объём в USD
+    """
+    close_volume = np.array([(candle[4], candle[5]) for candle in klines], dtype=np.float64)
+    return float((close_volume[:, 0] * close_volume[:, 1]).mean())
+
+
 async def get_average_daily_volume(
     symbol: str,  # ОБЯЗАТЕЛЬНЫЙ параметр (multi-asset support)
     days: int = 20,
@@ -716,14 +733,7 @@ async def get_average_daily_volume(
             if not data or len(data) < days:
                 return None
             
-            # Klines format: [timestamp, open, high, low, close, volume, ...]
-            # Volume находится на индексе 5
-            volumes = [float(candle[5]) * float(candle[4]) for candle in data]  # volume * close_price = USD volume
-            
-            # Средний дневной объём
-            avg_volume = sum(volumes) / len(volumes)
-            
-            return avg_volume
+            return _adv_from_klines(data)
             
         except Exception as e:
             # Логирование ошибки (опционально)
@@ -1239,24 +1239,13 @@ class PostgresRepository:
         # Извлекаем ATR (volatility_at_entry)
         atr = float(iceberg['volatility_at_entry'] or 0)
         
-        if atr == 0:
-            return 0  # WHY: Не можем посчитать без ATR
+        # WHY: Без ATR (None/0) барьеров нет - Neutral сразу, без settling и запроса цен
+        if not atr:
+            return 0
         
         price = float(iceberg['price'])
         is_ask = iceberg['is_ask']
         
-        # WHY: Wide Stops для Swing Trading (3x ATR)
-        stop_dist = 3.0 * atr
-        take_dist = 6.0 * atr  # Risk/Reward 1:2
-        
-        # WHY: Барьеры зависят от направления
-        if is_ask:  # SELL Iceberg (сопротивление)
-            upper_barrier = price + stop_dist   # Stop Loss выше
-            lower_barrier = price - take_dist   # Take Profit ниже
-        else:  # BUY Iceberg (поддержка)
-            upper_barrier = price + take_dist   # Take Profit выше
-            lower_barrier = price - stop_dist   # Stop Loss ниже
-        
         # === GEMINI FIX #2: Falling Knife Veto (Cascade Protection) ===
         # WHY: Проверяем экстремальную волатильность (каскад ликвидаций)
         # Если ATR > 2% от цены -> VETO на вход независимо от паники
@@ -1335,25 +1324,56 @@ class PostgresRepository:
                 ORDER BY time ASC
             """, iceberg['symbol'], start_time, start_time + timedelta(days=7))
             
-            # Проверяем каждую свечу на пробитие барьеров
             # WHY: Используем только свечи ПОСЛЕ start_time (уже отфильтрованы SQL)
-            for c in candles:
-                p = float(c['close'])
-                
-                if is_ask:  # SELL Iceberg
-                    if p >= upper_barrier:
-                        return -1  # Loss (Stop Hit)
-                    if p <= lower_barrier:
-                        return 1   # Win (Take Hit)
-                else:  # BUY Iceberg
-                    if p <= lower_barrier:
-                        return -1  # Loss (Stop Hit)
-                    if p >= upper_barrier:
-                        return 1   # Win (Take Hit)
-            
-            # WHY: Time Expiration - ни один барьер не пробит за 7 дней
-            return 0
+            return self._compute_outcome(candles, is_ask, price, atr)
             
         except Exception as e:
             print(f"⚠️ _calculate_outcome error for iceberg {iceberg['id']}: {e}")
-            return 0  # WHY: При ошибке считаем Neutral
\ No newline at end of file
+            return 0  # WHY: При ошибке считаем Neutral
+    
+    @staticmethod
+    def _compute_outcome(candles, is_ask: bool, price: float, atr: Optional[float]) -> int:
+        """
+        WHY: Чистая логика барьеров без БД - тестируется без conn и event loop.
+        
+        Args:
+            candles: Свечи с ключом 'close', отсортированные по времени
+            is_ask: True для SELL айсберга, False для BUY
+            price: Цена айсберга (entry)
+            atr: ATR на момент входа (None/0 → Neutral)
+        
+        Returns:
+            1 = Win, 0 = Neutral, -1 = Loss
+        """
+        if not atr:
+            return 0  # WHY: Не можем посчитать без ATR
+        
+        # WHY: Wide Stops для Swing Trading (3x ATR)
+        stop_dist = 3.0 * atr
+        take_dist = 6.0 * atr  # Risk/Reward 1:2
+        
+        # WHY: Барьеры зависят от направления
+        if is_ask:  # SELL Iceberg (сопротивление)
+            upper_barrier = price + stop_dist   # Stop Loss выше
+            lower_barrier = price - take_dist   # Take Profit ниже
+        else:  # BUY Iceberg (поддержка)
+            upper_barrier = price + take_dist   # Take Profit выше
+            lower_barrier = price - stop_dist   # Stop Loss ниже
+        
+        # Проверяем каждую свечу на пробитие барьеров
+        for c in candles:
+            p = float(c['close'])
+            
+            if is_ask:  # SELL Iceberg
+                if p >= upper_barrier:
+                    return -1  # Loss (Stop Hit)
+                if p <= lower_barrier:
+                    return 1   # Win (Take Hit)
+            else:  # BUY Iceberg
+                if p <= lower_barrier:
+                    return -1  # Loss (Stop Hit)
+                if p >= upper_barrier:
+                    return 1   # Win (Take Hit)
+        
+        # WHY: Time Expiration - ни один барьер не пробит за 7 дней
+        return 0
\ No newline at end of file
@@ -275,6 +275,26 @@ class TradingEngine:
         
         # Warmup еще активен
         return True
+    
+    def _should_write_db(self, now: float) -> bool:
+        """
+        WHY: Throttle DB writes (100ms) при лавинообразных рефиллах айсберга.
+        
+        Снапшот FeatureCollector собирается на каждый рефилл,
+        ограничивается только запись в БД.
+        
+        Args:
+            now: Текущее время (unix seconds)
+        
+        Returns:
+            True - запись разрешена (таймер сброшен на now)
+            False - с прошлой записи прошло < 100ms
+        """
+        if now - self.last_db_write_time < 0.1:
+            return False
+        
+        self.last_db_write_time = now
+        return True
 
     async def _initialize_book(self):
         """
@@ -353,7 +373,7 @@ class TradingEngine:
             # === НОВОЕ: Записываем задержку ===
             import time
             arrival_time_ms = time.time() * 1000
-            event_time_ms = int(update.event_time.timestamp() * 1000)
+            event_time_ms = update.event_time  # WHY: OrderBookUpdate.event_time уже int (мс)
             self.latency_monitor.record_latency(event_time_ms, arrival_time_ms)
             
             await self.depth_queue.put(update)
@@ -434,9 +454,8 @@ class TradingEngine:
             # 3. Забираем Обновления стакана (Priority 1 - Низший)
             while not self.depth_queue.empty():
                 update = self.depth_queue.get_nowait()
-                # Приводим время к timestamp (мс) для корректной сортировки с трейдами
-                ts = update.event_time.timestamp() * 1000 
-                self.buffer.add(update, event_time=ts, priority=1)
+                # WHY: event_time уже в мс - та же шкала, что у трейдов
+                self.buffer.add(update, event_time=update.event_time, priority=1)
 
             # 4. FIX VULNERABILITY #3: Получаем ТОЛЬКО события старше delay_sec
             # WHY: Time-window filtering гарантирует что Trade и Depth обрабатываются ВМЕСТЕ
@@ -460,7 +479,7 @@ class TradingEngine:
                         try:
                             if self.book.apply_update(update):
                                 # === NEW: Delta-t Iceberg Detection ===
-                                update_time_ms = int(update.event_time.timestamp() * 1000)
+                                update_time_ms = update.event_time
                             
                                 for pending in list(self.book.pending_refill_checks):
                                     trade = pending['trade']
@@ -586,12 +605,7 @@ class TradingEngine:
                                                     continue  # Пропускаем DB write на cold start
                                             
                                                 # 2. THROTTLE ТОЛЬКО DB writes (100ms)
-                                                import time
-                                                current_time = time.time()
-                                                time_since_last_write = current_time - self.last_db_write_time
-                                            
-                                                if self.repository and time_since_last_write >= 0.1:  # 100ms throttle
-                                                    self.last_db_write_time = current_time
+                                                if self.repository and self._should_write_db(time.time()):
                                                 
                                                     # 3. Классифицируем намерение (SCALPER/INTRADAY/POSITIONAL)
                                                     # TODO: Replace estimated_adv with actual ADV from historical_memory
@@ -627,8 +641,8 @@ class TradingEngine:
                             
                                 if not self.book.validate_integrity():
                                     print("❌ Book integrity failed! Resyncing...")
-                                await self._resync()
-                                break
+                                    await self._resync()
+                                    break
                         except GapDetectedError:
                             print("⚠️ Gap detected in order book. Resyncing...")
                             await self._resync()
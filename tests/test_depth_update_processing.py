@@ -0,0 +1,100 @@
+"""
+WHY: Регрессии обработки OrderBookUpdate в TradingEngine.
+
+Проверяем:
+1. Валидный update применяется без resync (resync только при crossed book)
+2. event_time (int, мс) идёт в LatencyMonitor и ReorderingBuffer как есть
+"""
+
+import asyncio
+import pytest
+from decimal import Decimal
+from unittest.mock import MagicMock, AsyncMock
+
+from domain import OrderBookUpdate
+from services import TradingEngine
+
+
+# WHY: Decimal неизменяем - парсим повторяющиеся литералы один раз на модуль
+_PX_60K = Decimal("60000.00")
+_PX_60100 = Decimal("60100.00")
+_EVENT_TIME_MS = 1638747660050
+
+
+def _update(update_id: int, bid_qty: str) -> OrderBookUpdate:
+    return OrderBookUpdate(
+        first_update_id=update_id,
+        final_update_id=update_id,
+        bids=[(_PX_60K, Decimal(bid_qty))],
+        asks=[],
+        event_time=_EVENT_TIME_MS
+    )
+
+
+@pytest.fixture
+def engine():
+    engine = TradingEngine("BTCUSDT", MagicMock())
+    engine.book.apply_snapshot(
+        bids=[(_PX_60K, Decimal("10.0"))],
+        asks=[(_PX_60100, Decimal("5.0"))],
+        last_update_id=100
+    )
+    engine._resync = AsyncMock()
+    engine.buffer.delay_sec = 0
+    return engine
+
+
+async def _run_one_batch(engine, events):
+    """
+    WHY: _consume_and_analyze() - бесконечный цикл. Первый pop_ready() отдаёт batch,
+    второй прерывает цикл CancelledError (как отмена задачи в run()).
+    """
+    engine.buffer.pop_ready = MagicMock(side_effect=[events, asyncio.CancelledError()])
+    with pytest.raises(asyncio.CancelledError):
+        await engine._consume_and_analyze()
+
+
+async def test_valid_update_does_not_trigger_resync(engine):
+    """Книга не crossed - update применяется, resync не вызывается"""
+    await _run_one_batch(engine, [_update(101, "9.0")])
+
+    assert engine.book.last_update_id == 101
+    assert engine.book.bids[_PX_60K] == Decimal("9.0")
+    engine._resync.assert_not_called()
+
+
+async def test_consecutive_updates_all_applied(engine):
+    """WHY: Лишний resync + break обрывал batch после первого update"""
+    await _run_one_batch(engine, [_update(101, "9.0"), _update(102, "8.0")])
+
+    assert engine.book.last_update_id == 102
+    assert engine.book.bids[_PX_60K] == Decimal("8.0")
+    engine._resync.assert_not_called()
+
+
+async def test_depth_event_time_ms_goes_into_buffer(engine):
+    """event_time уже в мс - ReorderingBuffer получает его без конвертации"""
+    engine.buffer.add = MagicMock(wraps=engine.buffer.add)
+    update = _update(101, "9.0")
+    engine.depth_queue.put_nowait(update)
+
+    await _run_one_batch(engine, [])
+
+    engine.buffer.add.assert_called_once_with(update, event_time=_EVENT_TIME_MS, priority=1)
+
+
+async def test_depth_producer_records_latency_in_ms(engine):
+    """_produce_depth() передаёт event_time (мс) в LatencyMonitor и кладёт update в очередь"""
+    update = _update(101, "9.0")
+
+    async def listen_updates(symbol):
+        yield update
+
+    engine.infra.listen_updates = listen_updates
+    engine.latency_monitor.record_latency = MagicMock()
+
+    await engine._produce_depth()
+
+    event_time_ms, _arrival_ms = engine.latency_monitor.record_latency.call_args.args
+    assert event_time_ms == _EVENT_TIME_MS
+    assert engine.depth_queue.get_nowait() is update
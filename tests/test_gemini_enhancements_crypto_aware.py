@@ -15,6 +15,13 @@ import pytest
 from domain import IcebergLevel, LocalOrderBook, TradeEvent
 
 
+# WHY: Decimal неизменяем - парсим повторяющиеся литералы один раз на модуль
+_PX_60K = Decimal('60000')
+_PX_61K = Decimal('61000')
+_QTY_HALF = Decimal('0.5')
+_QTY_5 = Decimal('5.0')
+
+
 class TestCryptoAwareMicroDivergence:
     """
     Тесты новой crypto-aware логики update_micro_divergence()
@@ -32,7 +39,7 @@ class TestCryptoAwareMicroDivergence:
         """
         # Arrange
         iceberg = IcebergLevel(
-            price=Decimal('60000'),
+            price=_PX_60K,
             is_ask=False,
             total_hidden_volume=Decimal('10.0'),
             confidence_score=0.9
@@ -62,7 +69,7 @@ class TestCryptoAwareMicroDivergence:
         """
         # Arrange
         iceberg = IcebergLevel(
-            price=Decimal('60000'),
+            price=_PX_60K,
             is_ask=False,
             total_hidden_volume=Decimal('15.0'),
             confidence_score=0.7
@@ -89,7 +96,7 @@ class TestCryptoAwareMicroDivergence:
         """
         # Arrange
         iceberg = IcebergLevel(
-            price=Decimal('60000'),
+            price=_PX_60K,
             is_ask=False,
             total_hidden_volume=Decimal('10.0'),
             confidence_score=0.9
@@ -125,13 +132,13 @@ class TestFullCycleCryptoScenarios:
         # Arrange: Книга ордеров
         book = LocalOrderBook(symbol='BTCUSDT')
         book.bids = {
-            Decimal('60000'): Decimal('2.0'),
+            _PX_60K: Decimal('2.0'),
             Decimal('59990'): Decimal('1.5'),
             Decimal('59980'): Decimal('1.5')
         }  # Total: 5 BTC
         
         iceberg = IcebergLevel(
-            price=Decimal('60000'),
+            price=_PX_60K,
             is_ask=False,
             total_hidden_volume=Decimal('10.0'),
             confidence_score=0.85
@@ -149,14 +156,15 @@ class TestFullCycleCryptoScenarios:
         )
         
         # Act 3: Trade Footprint
+        # WHY: Валидируем прототип один раз, копии отличаются только event_time
+        proto = TradeEvent(
+            price=_PX_60K,
+            quantity=_QTY_HALF,  # Minnow
+            is_buyer_maker=True,  # SELL (паника)
+            event_time=0
+        )
         for i in range(10):
-            trade = TradeEvent(
-                price=Decimal('60000'),
-                quantity=Decimal('0.5'),  # Minnow
-                is_buyer_maker=True,  # SELL (паника)
-                event_time=1000 + i
-            )
-            iceberg.add_trade_to_footprint(trade)
+            iceberg.add_trade_to_footprint(proto.model_copy(update={'event_time': 1000 + i}))
         
         # Assert
         assert depth_ratio == 2.0, "Айсберг поглотил 200% видимой ликвидности"
@@ -182,13 +190,13 @@ class TestFullCycleCryptoScenarios:
         # Arrange
         book = LocalOrderBook(symbol='BTCUSDT')
         book.asks = {
-            Decimal('61000'): Decimal('5.0'),
+            _PX_61K: _QTY_5,
             Decimal('61010'): Decimal('3.0'),
             Decimal('61020'): Decimal('2.0')
         }  # Total: 10 BTC
         
         iceberg = IcebergLevel(
-            price=Decimal('61000'),
+            price=_PX_61K,
             is_ask=True,
             total_hidden_volume=Decimal('3.0'),
             confidence_score=0.8
@@ -206,14 +214,14 @@ class TestFullCycleCryptoScenarios:
         )
         
         # Act 3: Trade Footprint
+        proto = TradeEvent(
+            price=_PX_61K,
+            quantity=_QTY_5,  # Whale size
+            is_buyer_maker=False,  # BUY (атака на ASK)
+            event_time=0
+        )
         for i in range(5):
-            trade = TradeEvent(
-                price=Decimal('61000'),
-                quantity=Decimal('5.0'),  # Whale size
-                is_buyer_maker=False,  # BUY (атака на ASK)
-                event_time=1000 + i
-            )
-            iceberg.add_trade_to_footprint(trade)
+            iceberg.add_trade_to_footprint(proto.model_copy(update={'event_time': 1000 + i}))
         
         # Assert
         assert depth_ratio < 0.5, "Айсберг мал относительно стакана"
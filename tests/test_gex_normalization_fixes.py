@@ -15,10 +15,26 @@ from analyzers import IcebergAnalyzer
 from config import BTC_CONFIG
 
 
+# WHY: Decimal неизменяем - парсим повторяющиеся литералы один раз на модуль
+_PX_100K = Decimal("100000")
+
+
+@pytest.fixture(scope="module")
+def analyzer():
+    """WHY: adjust_confidence_by_gamma() не мутирует анализатор - один экземпляр на модуль"""
+    return IcebergAnalyzer(BTC_CONFIG)
+
+
+@pytest.fixture(scope="module")
+def book():
+    """WHY: Каждый тест сам назначает book.gamma_profile перед использованием"""
+    return LocalOrderBook(symbol="BTCUSDT")
+
+
 class TestGEXNormalization:
     """Проверяем, что используется normalized GEX вместо абсолютного."""
     
-    def test_normalized_gex_above_threshold_triggers_bonus(self):
+    def test_normalized_gex_above_threshold_triggers_bonus(self, analyzer, book):
         """
         WHY: Проверяем, что normalized GEX > 0.1 (10% от ADV) активирует бонус.
         
@@ -27,9 +43,6 @@ class TestGEXNormalization:
         - total_gex_normalized = 0.15 (15% от ADV) → ВЫШЕ порога
         - Ожидаем: confidence увеличен (>= base)
         """
-        analyzer = IcebergAnalyzer(BTC_CONFIG)
-        book = LocalOrderBook(symbol="BTCUSDT")
-        
         # Создаем GammaProfile с НОРМАЛИЗОВАННЫМ GEX
         book.gamma_profile = GammaProfile(
             total_gex=50_000_000,  # Абсолютное значение (не используется)
@@ -41,7 +54,7 @@ class TestGEXNormalization:
         
         # WHY: Используем base_confidence = 0.5 для консистентности
         base_confidence = 0.5
-        price = Decimal("100000")  # На gamma wall (call_wall)
+        price = _PX_100K  # На gamma wall (call_wall)
         
         adjusted, is_major = analyzer.adjust_confidence_by_gamma(
             base_confidence=base_confidence,
@@ -56,7 +69,7 @@ class TestGEXNormalization:
         assert adjusted > base_confidence, \
             f"Normalized GEX = 0.15 (>0.1) должно повысить confidence, но {adjusted} <= {base_confidence}"
     
-    def test_normalized_gex_below_threshold_no_bonus(self):
+    def test_normalized_gex_below_threshold_no_bonus(self, analyzer, book):
         """
         WHY: Normalized GEX < 0.1 НЕ должен давать бонус.
         
@@ -64,9 +77,6 @@ class TestGEXNormalization:
         - total_gex_normalized = 0.05 (5% от ADV) → НИЖЕ порога
         - Ожидаем: confidence не изменен или изменен минимально
         """
-        analyzer = IcebergAnalyzer(BTC_CONFIG)
-        book = LocalOrderBook(symbol="BTCUSDT")
-        
         book.gamma_profile = GammaProfile(
             total_gex=10_000_000,
             total_gex_normalized=0.05,  # 5% от ADV → НИЖЕ порога 0.1
@@ -77,7 +87,7 @@ class TestGEXNormalization:
         
         # WHY: Используем base_confidence = 0.5 для консистентности
         base_confidence = 0.5
-        price = Decimal("100000")  # На gamma wall
+        price = _PX_100K  # На gamma wall
         
         adjusted, is_major = analyzer.adjust_confidence_by_gamma(
             base_confidence=base_confidence,
@@ -94,143 +104,71 @@ class TestGEXNormalization:
             f"Normalized GEX = 0.05 (<0.1) не должно давать большой бонус, но {adjusted} > {base_confidence * 1.1}"
 
 
+def _adjusted_before_expiry(analyzer, book, time_to_expiry):
+    """
+    WHY: Сценарии decay отличаются только временем до expiry -
+    сильный GEX (0.2) на call_wall, base_confidence = 0.5
+    (после x1.8 бонуса 0.9 < cap 1.0, не обрежется).
+    """
+    now = datetime.now(timezone.utc)
+    
+    book.gamma_profile = GammaProfile(
+        total_gex=100_000_000,
+        total_gex_normalized=0.2,  # Выше порога
+        call_wall=100000.0,
+        put_wall=95000.0,
+        timestamp=now,
+        expiry_timestamp=now + time_to_expiry
+    )
+    
+    adjusted, _ = analyzer.adjust_confidence_by_gamma(
+        base_confidence=0.5,
+        gamma_profile=book.gamma_profile,
+        price=_PX_100K,
+        is_ask=True,
+        vpin_score=None,
+        cvd_divergence=None
+    )
+    return adjusted
+
+
 class TestExpirationDecay:
     """Проверяем decay влияния GEX перед экспирацией опционов."""
     
-    def test_decay_at_2_hours_before_expiry(self):
+    def test_decay_at_2_hours_before_expiry(self, analyzer, book):
         """
         WHY: За 2 часа до экспирации decay_factor = 1.0 (полное влияние).
+        Полный бонус x1.8 = 0.9, допуск 5% вниз = 0.855.
         """
-        analyzer = IcebergAnalyzer(BTC_CONFIG)
-        book = LocalOrderBook(symbol="BTCUSDT")
-        
-        # Экспирация через 2 часа
-        expiry = datetime.now(timezone.utc) + timedelta(hours=2)
-        
-        book.gamma_profile = GammaProfile(
-            total_gex=100_000_000,
-            total_gex_normalized=0.2,  # Выше порога
-            call_wall=100000.0,
-            put_wall=95000.0,
-            timestamp=datetime.now(timezone.utc),
-            expiry_timestamp=expiry
-        )
+        adjusted = _adjusted_before_expiry(analyzer, book, timedelta(hours=2))
         
-        # WHY: Используем base_confidence = 0.5, чтобы после x1.8 бонуса не превысить cap (1.0)
-        # 0.5 * 1.8 = 0.9 (< 1.0, не обрежется)
-        base_confidence = 0.5
-        price = Decimal("100000")
-        
-        adjusted_2h, _ = analyzer.adjust_confidence_by_gamma(
-            base_confidence=base_confidence,
-            gamma_profile=book.gamma_profile,
-            price=price,
-            is_ask=True,
-            vpin_score=None,
-            cvd_divergence=None
-        )
-        
-        # Ожидаем: За 2 часа = полный бонус (decay_factor = 1.0)
-        # Максимальный бонус для +GEX на wall = x1.8
-        # 0.5 * 1.8 = 0.9
-        expected_approx = base_confidence * 1.8  # 0.9
-        
-        assert adjusted_2h >= expected_approx * 0.95, \
-            f"За 2 часа до экспирации должен быть почти полный бонус (~0.9), но {adjusted_2h} < {expected_approx * 0.95}"
+        assert adjusted >= 0.855, \
+            f"За 2 часа до экспирации должен быть почти полный бонус (~0.9), но {adjusted} < 0.855"
     
-    def test_decay_at_1_hour_before_expiry(self):
+    def test_decay_at_1_hour_before_expiry(self, analyzer, book):
         """
         WHY: За 1 час до экспирации decay_factor = 0.5 (50% влияния).
+        0.5 * (1.0 + 0.8 * 0.5) = 0.7: меньше почти полного бонуса (0.855), больше x1.2 (0.6).
         """
-        analyzer = IcebergAnalyzer(BTC_CONFIG)
-        book = LocalOrderBook(symbol="BTCUSDT")
-        
-        # Экспирация через 1 час
-        expiry = datetime.now(timezone.utc) + timedelta(hours=1)
-        
-        book.gamma_profile = GammaProfile(
-            total_gex=100_000_000,
-            total_gex_normalized=0.2,
-            call_wall=100000.0,
-            put_wall=95000.0,
-            timestamp=datetime.now(timezone.utc),
-            expiry_timestamp=expiry
-        )
-        
-        # WHY: Используем base_confidence = 0.5 для избежания cap
-        base_confidence = 0.5
-        price = Decimal("100000")
+        adjusted = _adjusted_before_expiry(analyzer, book, timedelta(hours=1))
         
-        adjusted_1h, _ = analyzer.adjust_confidence_by_gamma(
-            base_confidence=base_confidence,
-            gamma_profile=book.gamma_profile,
-            price=price,
-            is_ask=True,
-            vpin_score=None,
-            cvd_divergence=None
-        )
-        
-        # Ожидаем: За 1 час = 50% бонуса (decay_factor = 0.5)
-        # Бонус = 0.8 * 0.5 = 0.4
-        # Итого: confidence * (1.0 + 0.4) = 0.5 * 1.4 = 0.7
-        expected_approx = base_confidence * 1.4  # 0.7
-        
-        # Должно быть меньше полного бонуса (0.9) но больше базового (0.5)
-        assert adjusted_1h < base_confidence * 1.8 * 0.95, \
-            f"За 1 час до экспирации бонус должен уменьшиться (decay=0.5), но {adjusted_1h} >= {base_confidence * 1.8 * 0.95}"
-        
-        assert adjusted_1h > base_confidence * 1.2, \
-            f"За 1 час до экспирации все еще должен быть бонус (~0.7), но {adjusted_1h} <= {base_confidence * 1.2}"
+        assert 0.6 < adjusted < 0.855, \
+            f"За 1 час до экспирации ожидали бонус ~0.7 (0.6 < x < 0.855), но {adjusted}"
     
-    def test_decay_at_30_min_before_expiry(self):
+    def test_decay_at_30_min_before_expiry(self, analyzer, book):
         """
         WHY: За 30 минут до экспирации decay_factor = 0.25 (25% влияния).
+        0.5 * (1.0 + 0.8 * 0.25) = 0.6, окно x1.05..x1.35 = 0.525..0.675.
         """
-        analyzer = IcebergAnalyzer(BTC_CONFIG)
-        book = LocalOrderBook(symbol="BTCUSDT")
+        adjusted = _adjusted_before_expiry(analyzer, book, timedelta(minutes=30))
         
-        # Экспирация через 30 минут
-        expiry = datetime.now(timezone.utc) + timedelta(minutes=30)
-        
-        book.gamma_profile = GammaProfile(
-            total_gex=100_000_000,
-            total_gex_normalized=0.2,
-            call_wall=100000.0,
-            put_wall=95000.0,
-            timestamp=datetime.now(timezone.utc),
-            expiry_timestamp=expiry
-        )
-        
-        # WHY: Используем base_confidence = 0.5
-        base_confidence = 0.5
-        
-        adjusted_30m, _ = analyzer.adjust_confidence_by_gamma(
-            base_confidence=base_confidence,
-            gamma_profile=book.gamma_profile,
-            price=Decimal("100000"),
-            is_ask=True,
-            vpin_score=None,
-            cvd_divergence=None
-        )
-        
-        # Ожидаем: За 30 мин = 25% бонуса (decay_factor = 0.25)
-        # Бонус = 0.8 * 0.25 = 0.2
-        # Итого: confidence * (1.0 + 0.2) = 0.5 * 1.2 = 0.6
-        expected_approx = base_confidence * 1.2  # 0.6
-        
-        assert adjusted_30m <= base_confidence * 1.35, \
-            f"За 30 мин до экспирации бонус должен быть минимальным (~0.6), но {adjusted_30m} > {base_confidence * 1.35}"
-        
-        assert adjusted_30m >= base_confidence * 1.05, \
-            f"За 30 мин все еще должен быть небольшой бонус, но {adjusted_30m} < {base_confidence * 1.05}"
+        assert 0.525 <= adjusted <= 0.675, \
+            f"За 30 мин до экспирации ожидали минимальный бонус ~0.6 (0.525..0.675), но {adjusted}"
     
-    def test_no_decay_if_no_expiry_timestamp(self):
+    def test_no_decay_if_no_expiry_timestamp(self, analyzer, book):
         """
         WHY: Если expiry_timestamp = None, decay не применяется.
         """
-        analyzer = IcebergAnalyzer(BTC_CONFIG)
-        book = LocalOrderBook(symbol="BTCUSDT")
-        
         book.gamma_profile = GammaProfile(
             total_gex=100_000_000,
             total_gex_normalized=0.2,
@@ -246,7 +184,7 @@ class TestExpirationDecay:
         adjusted, _ = analyzer.adjust_confidence_by_gamma(
             base_confidence=base_confidence,
             gamma_profile=book.gamma_profile,
-            price=Decimal("100000"),
+            price=_PX_100K,
             is_ask=True,
             vpin_score=None,
             cvd_divergence=None
@@ -261,22 +199,20 @@ class TestExpirationDecay:
 class TestCombinedGEXFixes:
     """Проверяем совместную работу нормализации и decay."""
     
-    def test_low_normalized_gex_with_imminent_expiry(self):
+    def test_low_normalized_gex_with_imminent_expiry(self, analyzer, book):
         """
         WHY: Если GEX слабый (normalized < 0.1) И экспирация близко → нет бонуса.
         """
-        analyzer = IcebergAnalyzer(BTC_CONFIG)
-        book = LocalOrderBook(symbol="BTCUSDT")
-        
         # Слабый GEX + экспирация через 30 минут
-        expiry = datetime.now(timezone.utc) + timedelta(minutes=30)
+        now = datetime.now(timezone.utc)
+        expiry = now + timedelta(minutes=30)
         
         book.gamma_profile = GammaProfile(
             total_gex=5_000_000,
             total_gex_normalized=0.05,  # НИЖЕ порога
             call_wall=100000.0,
             put_wall=95000.0,
-            timestamp=datetime.now(timezone.utc),
+            timestamp=now,
             expiry_timestamp=expiry
         )
         
@@ -285,7 +221,7 @@ class TestCombinedGEXFixes:
         adjusted, _ = analyzer.adjust_confidence_by_gamma(
             base_confidence=base_confidence,
             gamma_profile=book.gamma_profile,
-            price=Decimal("100000"),
+            price=_PX_100K,
             is_ask=True,
             vpin_score=None,
             cvd_divergence=None
@@ -295,22 +231,20 @@ class TestCombinedGEXFixes:
         assert abs(adjusted - base_confidence) < 0.1, \
             f"Слабый GEX + близкая экспирация не должны давать бонус, но adjusted={adjusted}, base={base_confidence}"
     
-    def test_strong_normalized_gex_far_from_expiry(self):
+    def test_strong_normalized_gex_far_from_expiry(self, analyzer, book):
         """
         WHY: Если GEX сильный (normalized > 0.1) И экспирация далеко → максимальный бонус.
         """
-        analyzer = IcebergAnalyzer(BTC_CONFIG)
-        book = LocalOrderBook(symbol="BTCUSDT")
-        
         # Сильный GEX + экспирация через неделю
-        expiry = datetime.now(timezone.utc) + timedelta(days=7)
+        now = datetime.now(timezone.utc)
+        expiry = now + timedelta(days=7)
         
         book.gamma_profile = GammaProfile(
             total_gex=200_000_000,
             total_gex_normalized=0.3,  # ВЫШЕ порога
             call_wall=100000.0,
             put_wall=95000.0,
-            timestamp=datetime.now(timezone.utc),
+            timestamp=now,
             expiry_timestamp=expiry
         )
         
@@ -320,7 +254,7 @@ class TestCombinedGEXFixes:
         adjusted, is_major = analyzer.adjust_confidence_by_gamma(
             base_confidence=base_confidence,
             gamma_profile=book.gamma_profile,
-            price=Decimal("100000"),
+            price=_PX_100K,
             is_ask=True,
             vpin_score=None,
             cvd_divergence=None
@@ -23,8 +23,6 @@ ReorderingBuffer использует get_all_sorted() который ОЧИЩА
 5. test_adaptive_delay_integration: Буфер работает с адаптивным delay
 """
 
-import pytest
-import asyncio
 import time
 from decimal import Decimal
 from datetime import datetime, timezone
@@ -32,6 +30,15 @@ from infrastructure import ReorderingBuffer
 from domain import TradeEvent, OrderBookUpdate
 
 
+# WHY: Decimal неизменяем - парсим повторяющиеся литералы один раз на модуль
+_PX_50K = Decimal("50000")
+_PX_49999 = Decimal("49999")
+_PX_50001 = Decimal("50001")
+_QTY_1 = Decimal("1.0")
+_QTY_5 = Decimal("5.0")
+_QTY_10 = Decimal("10")
+
+
 class TestReorderingBufferTimeWindow:
     """Тесты временного окна ReorderingBuffer"""
     
@@ -50,8 +57,8 @@ class TestReorderingBufferTimeWindow:
         # Создаем Trade событие с текущим временем
         now_ms = int(time.time() * 1000)
         trade = TradeEvent(
-            price=Decimal("50000"),
-            quantity=Decimal("1.0"),
+            price=_PX_50K,
+            quantity=_QTY_1,
             is_buyer_maker=True,
             event_time=now_ms
         )
@@ -80,8 +87,8 @@ class TestReorderingBufferTimeWindow:
         # Создаем "старое" событие (100ms назад)
         old_time_ms = int((time.time() - 0.1) * 1000)  # 100ms ago
         trade = TradeEvent(
-            price=Decimal("50000"),
-            quantity=Decimal("1.0"),
+            price=_PX_50K,
+            quantity=_QTY_1,
             is_buyer_maker=True,
             event_time=old_time_ms
         )
@@ -121,16 +128,16 @@ class TestReorderingBufferTimeWindow:
         # T=0: Trade arrives
         base_time_ms = int((time.time() - 0.1) * 1000)  # 100ms ago (old event)
         trade = TradeEvent(
-            price=Decimal("50000"),
-            quantity=Decimal("5.0"),
+            price=_PX_50K,
+            quantity=_QTY_5,
             is_buyer_maker=False,  # Aggressive buy
             event_time=base_time_ms
         )
         
         # T+30ms: Depth arrives (iceberg refill!)
         depth = OrderBookUpdate(
-            bids=[(Decimal("49999"), Decimal("10"))],
-            asks=[(Decimal("50000"), Decimal("10"))],  # Volume restored!
+            bids=[(_PX_49999, _QTY_10)],
+            asks=[(_PX_50K, _QTY_10)],  # Volume restored!
             first_update_id=1000,
             final_update_id=1001,
             event_time=base_time_ms + 30  # 30ms later
@@ -165,15 +172,15 @@ class TestReorderingBufferTimeWindow:
         same_time_ms = int((time.time() - 0.1) * 1000)
         
         trade = TradeEvent(
-            price=Decimal("50000"),
-            quantity=Decimal("1.0"),
+            price=_PX_50K,
+            quantity=_QTY_1,
             is_buyer_maker=True,
             event_time=same_time_ms
         )
         
         depth = OrderBookUpdate(
-            bids=[(Decimal("49999"), Decimal("10"))],
-            asks=[(Decimal("50000"), Decimal("10"))],
+            bids=[(_PX_49999, _QTY_10)],
+            asks=[(_PX_50K, _QTY_10)],
             first_update_id=1000,
             final_update_id=1001,
             event_time=same_time_ms  # Same time!
@@ -205,19 +212,22 @@ class TestReorderingBufferTimeWindow:
         # Меняем delay динамически (симуляция adaptive delay)
         buffer.delay_sec = 0.1  # 100ms
         
+        # WHY: Одна точка отсчёта - оба события смещены от одного now_ms
+        now_ms = int(time.time() * 1000)
+        
         # Событие 150ms назад (старше 100ms)
-        old_event_ms = int((time.time() - 0.15) * 1000)
+        old_event_ms = now_ms - 150
         old_trade = TradeEvent(
-            price=Decimal("50000"),
-            quantity=Decimal("1.0"),
+            price=_PX_50K,
+            quantity=_QTY_1,
             is_buyer_maker=True,
             event_time=old_event_ms
         )
         
         # Событие 80ms назад (моложе 100ms)
-        recent_event_ms = int((time.time() - 0.08) * 1000)
+        recent_event_ms = now_ms - 80
         recent_trade = TradeEvent(
-            price=Decimal("50001"),
+            price=_PX_50001,
             quantity=Decimal("2.0"),
             is_buyer_maker=False,
             event_time=recent_event_ms
@@ -239,8 +249,7 @@ class TestReorderingBufferTimeWindow:
 class TestGhostTradeScenario:
     """Интеграционный тест: полный сценарий Ghost Trade"""
     
-    @pytest.mark.asyncio
-    async def test_full_ghost_trade_scenario(self):
+    def test_full_ghost_trade_scenario(self):
         """
         Симуляция реального HFT сценария с race condition.
         
@@ -260,8 +269,8 @@ class TestGhostTradeScenario:
         # T=0: Trade
         trade_time_ms = int(base_time * 1000)
         trade = TradeEvent(
-            price=Decimal("50000"),
-            quantity=Decimal("5.0"),
+            price=_PX_50K,
+            quantity=_QTY_5,
             is_buyer_maker=False,
             event_time=trade_time_ms
         )
@@ -269,16 +278,17 @@ class TestGhostTradeScenario:
         # T+35ms: Depth (iceberg refill)
         depth_time_ms = trade_time_ms + 35
         depth = OrderBookUpdate(
-            bids=[(Decimal("49999"), Decimal("10"))],
-            asks=[(Decimal("50000"), Decimal("10"))],
+            bids=[(_PX_49999, _QTY_10)],
+            asks=[(_PX_50K, _QTY_10)],
             first_update_id=1000,
             final_update_id=1001,
             event_time=depth_time_ms
         )
         
         # Симулируем асинхронное прибытие
+        # WHY: pop_ready() смотрит только на event_time - разнос в 35ms уже задан
+        # через depth_time_ms, реальная пауза между add() не нужна
         buffer.add(trade, event_time=trade_time_ms, priority=0)
-        await asyncio.sleep(0.035)  # 35ms delay
         buffer.add(depth, event_time=depth_time_ms, priority=1)
         
         # Вызываем pop_ready() (оба события старше 50ms от base_time)
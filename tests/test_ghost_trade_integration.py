@@ -6,7 +6,6 @@ services.py + infrastructure.py + domain.py
 """
 
 import pytest
-import asyncio
 from decimal import Decimal
 from datetime import datetime, timezone
 import time
@@ -14,11 +13,39 @@ from infrastructure import ReorderingBuffer
 from domain import TradeEvent, OrderBookUpdate
 
 
+# WHY: Decimal неизменяем - парсим повторяющиеся литералы один раз на модуль
+_PX_50K = Decimal("50000")
+_PX_49999 = Decimal("49999")
+_QTY_1 = Decimal("1.0")
+_QTY_10 = Decimal("10")
+
+
+class FakeClock:
+    """
+    WHY: ReorderingBuffer.pop_ready() сравнивает event_time с локальными часами.
+    Виртуальные часы двигаем вручную вместо реального asyncio.sleep().
+    """
+    
+    def __init__(self, start: float = 1_700_000_000.0):
+        self.t = start
+    
+    def now(self) -> float:
+        return self.t
+    
+    def advance(self, dt: float) -> None:
+        self.t += dt
+
+
+@pytest.fixture
+def clock():
+    """WHY: Передаётся в ReorderingBuffer(clock=clock.now) - глобальный time.time не трогаем"""
+    return FakeClock()
+
+
 class TestGhostTradeProductionIntegration:
     """Интеграционные тесты для production сценариев"""
     
-    @pytest.mark.asyncio
-    async def test_production_workflow_with_pop_ready(self):
+    def test_production_workflow_with_pop_ready(self, clock):
         """
         Симуляция реального production workflow services.py:
         
@@ -30,27 +57,27 @@ class TestGhostTradeProductionIntegration:
         
         ОЖИДАНИЕ: Trade и Depth обрабатываются ВМЕСТЕ
         """
-        buffer = ReorderingBuffer(delay_ms=50)
+        buffer = ReorderingBuffer(delay_ms=50, clock=clock.now)
         
         # === ITERATION 1 ===
         # T=0: Sleep
-        await asyncio.sleep(0.05)  # 50ms delay
+        clock.advance(0.05)  # 50ms delay
         
         # T=50ms: Добавляем старые события (эмуляция "уже пришедших")
-        old_time = time.time() - 0.2  # 200ms ago
+        old_time = clock.now() - 0.2  # 200ms ago
         trade_time_ms = int(old_time * 1000)
         depth_time_ms = trade_time_ms + 30  # +30ms
         
         trade = TradeEvent(
-            price=Decimal("50000"),
+            price=_PX_50K,
             quantity=Decimal("5.0"),
             is_buyer_maker=False,
             event_time=trade_time_ms
         )
         
         depth = OrderBookUpdate(
-            bids=[(Decimal("49999"), Decimal("10"))],
-            asks=[(Decimal("50000"), Decimal("10"))],  # Refilled!
+            bids=[(_PX_49999, _QTY_10)],
+            asks=[(_PX_50K, _QTY_10)],  # Refilled!
             first_update_id=1000,
             final_update_id=1001,
             event_time=depth_time_ms
@@ -69,12 +96,11 @@ class TestGhostTradeProductionIntegration:
         
         # === ITERATION 2 ===
         # Buffer должен быть пустым
-        await asyncio.sleep(0.05)
+        clock.advance(0.05)
         sorted_events2 = buffer.pop_ready()
         assert len(sorted_events2) == 0, "Buffer should be empty"
     
-    @pytest.mark.asyncio
-    async def test_fresh_events_remain_in_buffer(self):
+    def test_fresh_events_remain_in_buffer(self, clock):
         """
         КРИТИЧЕСКИЙ ТЕСТ: Свежие события НЕ должны обрабатываться сразу.
         
@@ -85,13 +111,13 @@ class TestGhostTradeProductionIntegration:
         - Событие остается в buffer
         - Через 60ms pop_ready() должен вернуть событие
         """
-        buffer = ReorderingBuffer(delay_ms=50)
+        buffer = ReorderingBuffer(delay_ms=50, clock=clock.now)
         
         # Добавляем СВЕЖЕЕ событие
-        now_ms = int(time.time() * 1000)
+        now_ms = int(clock.now() * 1000)
         fresh_trade = TradeEvent(
-            price=Decimal("50000"),
-            quantity=Decimal("1.0"),
+            price=_PX_50K,
+            quantity=_QTY_1,
             is_buyer_maker=True,
             event_time=now_ms
         )
@@ -106,15 +132,14 @@ class TestGhostTradeProductionIntegration:
         assert len(buffer.buffer) == 1, "Event should remain in buffer"
         
         # Ждем 60ms (больше delay)
-        await asyncio.sleep(0.06)
+        clock.advance(0.06)
         
         # Теперь событие должно вернуться
         ready2 = buffer.pop_ready()
         assert len(ready2) == 1, "Old event should be returned now"
         assert ready2[0] == fresh_trade
     
-    @pytest.mark.asyncio
-    async def test_adaptive_delay_changes_filtering(self):
+    def test_adaptive_delay_changes_filtering(self, clock):
         """
         Проверка что изменение delay_sec динамически влияет на фильтрацию.
         
@@ -123,13 +148,13 @@ class TestGhostTradeProductionIntegration:
         - Меняем на delay=100ms (сеть замедлилась)
         - Проверяем что фильтрация изменилась
         """
-        buffer = ReorderingBuffer(delay_ms=50)
+        buffer = ReorderingBuffer(delay_ms=50, clock=clock.now)
         
         # Событие 80ms назад
-        old_time_80ms = int((time.time() - 0.08) * 1000)
+        old_time_80ms = int((clock.now() - 0.08) * 1000)
         trade_80 = TradeEvent(
-            price=Decimal("50000"),
-            quantity=Decimal("1.0"),
+            price=_PX_50K,
+            quantity=_QTY_1,
             is_buyer_maker=True,
             event_time=old_time_80ms
         )
@@ -141,7 +166,7 @@ class TestGhostTradeProductionIntegration:
         assert len(ready) == 1, "80ms old event should be ready with 50ms delay"
         
         # Добавляем еще одно событие 80ms назад
-        old_time_80ms_2 = int((time.time() - 0.08) * 1000)
+        old_time_80ms_2 = int((clock.now() - 0.08) * 1000)
         trade_80_2 = TradeEvent(
             price=Decimal("50001"),
             quantity=Decimal("2.0"),
@@ -159,7 +184,7 @@ class TestGhostTradeProductionIntegration:
         assert len(ready2) == 0, "80ms old event should NOT be ready with 100ms delay"
         
         # Ждем еще 30ms (итого 110ms)
-        await asyncio.sleep(0.03)
+        clock.advance(0.03)
         
         # Теперь должно вернуться
         ready3 = buffer.pop_ready()
@@ -180,15 +205,15 @@ class TestBackwardCompatibility:
         old_time = int((time.time() - 0.1) * 1000)
         
         trade = TradeEvent(
-            price=Decimal("50000"),
-            quantity=Decimal("1.0"),
+            price=_PX_50K,
+            quantity=_QTY_1,
             is_buyer_maker=True,
             event_time=old_time
         )
         
         depth = OrderBookUpdate(
-            bids=[(Decimal("49999"), Decimal("10"))],
-            asks=[(Decimal("50000"), Decimal("10"))],
+            bids=[(_PX_49999, _QTY_10)],
+            asks=[(_PX_50K, _QTY_10)],
             first_update_id=1000,
             final_update_id=1001,
             event_time=old_time + 20
@@ -12,13 +12,22 @@ WHY: Тестируем ретроспективную разметку данн
 """
 
 import pytest
+from bisect import bisect_right
 from datetime import datetime, timedelta
 from decimal import Decimal
-import asyncpg
 
 from repository import PostgresRepository
 
 
+@pytest.fixture(scope="module")
+def repo():
+    """
+    WHY: _calculate_outcome() работает только через переданный conn,
+    пул не создаётся - один репозиторий на модуль.
+    """
+    return PostgresRepository(dsn="mock")
+
+
 class TestCalculateOutcome:
     """Тесты для логики расчёта исхода"""
     
@@ -36,6 +45,18 @@ class TestCalculateOutcome:
             def __init__(self):
                 self.candles = []
             
+            @property
+            def candles(self):
+                return self._candles
+            
+            @candles.setter
+            def candles(self, candles):
+                # WHY: Сортируем один раз при присвоении (как ORDER BY time в SQL),
+                # fetch() потом режет срез через bisect вместо прохода по всем свечам.
+                # Свечи без 'time' считаем бесконечно поздними - они всегда проходят фильтр
+                self._candles = sorted(candles, key=lambda c: c.get('time', datetime.max))
+                self._times = [c.get('time', datetime.max) for c in self._candles]
+            
             async def fetch(self, query, *args):
                 """
                 Эмулирует SQL: WHERE time > $2
@@ -50,11 +71,7 @@ class TestCalculateOutcome:
                     
                     # WHY: Фильтруем свечи, эмулируя SQL WHERE time > $2
                     # Это критически важно для тестов Smart Settling!
-                    filtered = [
-                        c for c in self.candles 
-                        if c.get('time', datetime.max) > start_time
-                    ]
-                    return filtered
+                    return self._candles[bisect_right(self._times, start_time):]
                 
                 # WHY: Fallback если start_time не передан
                 return self.candles
@@ -65,206 +82,82 @@ class TestCalculateOutcome:
         
         return MockConn()
     
-    @pytest.mark.asyncio
-    async def test_calculate_outcome_win_buy_iceberg(self, mock_conn):
+    @pytest.mark.parametrize("is_ask, atr, closes, expected", [
+        # BUY at 60000, ATR=500 → take_profit = 63000, достигается на 3й свече
+        pytest.param(False, 500.0, [60200.0, 61500.0, 63100.0, 62000.0], 1, id="win_buy_iceberg"),
+        # BUY at 60000, ATR=500 → stop_loss = 58500, пробит на 2й свече
+        pytest.param(False, 500.0, [59500.0, 58000.0, 59000.0], -1, id="loss_buy_iceberg"),
+        # SELL at 60000 (сопротивление), ATR=500 → take_profit = 57000
+        pytest.param(True, 500.0, [59000.0, 57500.0, 56800.0], 1, id="win_sell_iceberg"),
+        # Цена колеблется в диапазоне - ни один барьер не пробит за 7 дней
+        pytest.param(False, 500.0, [60100.0, 60200.0, 59900.0, 60300.0], 0, id="neutral_no_barrier_hit"),
+        # Граничный случай: нет ATR - не можем рассчитать барьеры
+        # (свеча 63100 иначе дала бы take profit)
+        pytest.param(False, None, [63100.0], 0, id="no_atr_returns_neutral"),
+        # ATR = 0 (нет волатильности)
+        pytest.param(False, 0.0, [63100.0], 0, id="zero_atr_returns_neutral"),
+    ])
+    async def test_calculate_outcome(self, repo, mock_conn, is_ask, atr, closes, expected):
         """
-        WHY: Тест WIN сценария для BUY айсберга.
-        
-        Scenario: 
-        - BUY iceberg at 60000 (is_ask=False)
-        - ATR = 500 → take_profit = 60000 + 3000 = 63000
-        - Цена достигает 63000 на 3й свече
-        
-        Expected: Win (1)
+        WHY: Таблица сценариев Win (1) / Loss (-1) / Neutral (0)
+        для айсберга на 60000 с барьерами stop = 3*ATR, take = 6*ATR.
         """
         # Arrange
-        repo = PostgresRepository(dsn="mock")
-        
         iceberg_data = {
             'id': 'test-uuid',
             'symbol': 'BTCUSDT',
             'price': Decimal('60000'),
-            'is_ask': False,  # BUY iceberg (поддержка)
+            'is_ask': is_ask,
             'event_time': datetime(2025, 1, 1),
-            'volatility_at_entry': 500.0  # ATR
+            'volatility_at_entry': atr
         }
         
-        # Симулируем свечи: цена растёт и достигает take profit
-        mock_conn.candles = [
-            {'close': 60200.0},  # +200
-            {'close': 61500.0},  # +1500
-            {'close': 63100.0},  # +3100 (TAKE PROFIT HIT!)
-            {'close': 62000.0}   # Откат (не важно уже)
-        ]
+        mock_conn.candles = [{'close': close} for close in closes]
         
         # Act
         outcome = await repo._calculate_outcome(mock_conn, iceberg_data)
         
         # Assert
-        assert outcome == 1, "Expected Win for take profit hit"
+        assert outcome == expected, f"Expected {expected}, got {outcome}"
     
-    @pytest.mark.asyncio
-    async def test_calculate_outcome_loss_buy_iceberg(self, mock_conn):
+    @pytest.mark.parametrize("atr", [
+        pytest.param(None, id="no_atr"),  # нет ATR - не можем рассчитать барьеры
+        pytest.param(0.0, id="zero_atr"),  # нет волатильности
+    ])
+    def test_compute_outcome_without_atr_is_neutral(self, repo, atr):
         """
-        WHY: Тест LOSS сценария для BUY айсберга.
-        
-        Scenario:
-        - BUY iceberg at 60000
-        - ATR = 500 → stop_loss = 60000 - 1500 = 58500
-        - Цена падает до 58000 на 2й свече
-        
-        Expected: Loss (-1)
-        """
-        # Arrange
-        repo = PostgresRepository(dsn="mock")
-        
-        iceberg_data = {
-            'id': 'test-uuid',
-            'symbol': 'BTCUSDT',
-            'price': Decimal('60000'),
-            'is_ask': False,
-            'event_time': datetime(2025, 1, 1),
-            'volatility_at_entry': 500.0
-        }
-        
-        # Цена падает и пробивает stop loss
-        mock_conn.candles = [
-            {'close': 59500.0},  # -500
-            {'close': 58000.0},  # -2000 (STOP LOSS HIT!)
-            {'close': 59000.0}   # Откат
-        ]
-        
-        # Act
-        outcome = await repo._calculate_outcome(mock_conn, iceberg_data)
-        
-        # Assert
-        assert outcome == -1, "Expected Loss for stop loss hit"
-    
-    @pytest.mark.asyncio
-    async def test_calculate_outcome_win_sell_iceberg(self, mock_conn):
-        """
-        WHY: Тест WIN для SELL айсберга (обратная логика).
-        
-        Scenario:
-        - SELL iceberg at 60000 (is_ask=True, сопротивление)
-        - ATR = 500 → take_profit = 60000 - 3000 = 57000
-        - Цена падает до 56800
-        
-        Expected: Win (1)
-        """
-        # Arrange
-        repo = PostgresRepository(dsn="mock")
-        
-        iceberg_data = {
-            'id': 'test-uuid',
-            'symbol': 'BTCUSDT',
-            'price': Decimal('60000'),
-            'is_ask': True,  # SELL iceberg
-            'event_time': datetime(2025, 1, 1),
-            'volatility_at_entry': 500.0
-        }
-        
-        # Цена падает (выгодно для шорта)
-        mock_conn.candles = [
-            {'close': 59000.0},
-            {'close': 57500.0},
-            {'close': 56800.0}  # TAKE PROFIT HIT
-        ]
-        
-        # Act
-        outcome = await repo._calculate_outcome(mock_conn, iceberg_data)
-        
-        # Assert
-        assert outcome == 1
-    
-    @pytest.mark.asyncio
-    async def test_calculate_outcome_neutral_no_barrier_hit(self, mock_conn):
+        WHY: Без ATR барьеров нет → Neutral (0), даже если свеча ушла далеко.
+        Чистая логика - вызываем без conn и event loop.
         """
-        WHY: Тест NEUTRAL - ни один барьер не пробит за 7 дней.
+        candles = [{'close': 63100.0}]
         
-        Expected: Neutral (0)
-        """
-        # Arrange
-        repo = PostgresRepository(dsn="mock")
-        
-        iceberg_data = {
-            'id': 'test-uuid',
-            'symbol': 'BTCUSDT',
-            'price': Decimal('60000'),
-            'is_ask': False,
-            'event_time': datetime(2025, 1, 1),
-            'volatility_at_entry': 500.0
-        }
-        
-        # Цена колеблется в диапазоне (не пробивает барьеры)
-        mock_conn.candles = [
-            {'close': 60100.0},
-            {'close': 60200.0},
-            {'close': 59900.0},
-            {'close': 60300.0}
-        ]
-        
-        # Act
-        outcome = await repo._calculate_outcome(mock_conn, iceberg_data)
-        
-        # Assert
-        assert outcome == 0, "Expected Neutral when no barrier hit"
-    
-    @pytest.mark.asyncio
-    async def test_calculate_outcome_no_atr_returns_neutral(self, mock_conn):
-        """
-        WHY: Граничный случай - нет ATR данных.
-        
-        Expected: Neutral (0) - не можем рассчитать барьеры
-        """
-        # Arrange
-        repo = PostgresRepository(dsn="mock")
-        
-        iceberg_data = {
-            'id': 'test-uuid',
-            'symbol': 'BTCUSDT',
-            'price': Decimal('60000'),
-            'is_ask': False,
-            'event_time': datetime(2025, 1, 1),
-            'volatility_at_entry': None  # НЕТ ATR!
-        }
-        
-        mock_conn.candles = []
-        
-        # Act
-        outcome = await repo._calculate_outcome(mock_conn, iceberg_data)
-        
-        # Assert
-        assert outcome == 0
-    
-    @pytest.mark.asyncio
-    async def test_calculate_outcome_zero_atr_returns_neutral(self, mock_conn):
+        assert repo._compute_outcome(candles, False, 60000.0, atr) == 0
+
+    @pytest.mark.parametrize("atr", [
+        pytest.param(None, id="no_atr"),
+        pytest.param(0.0, id="zero_atr"),
+    ])
+    async def test_calculate_outcome_without_atr_skips_query(self, repo, atr):
         """
-        WHY: ATR = 0 (нет волатильности).
-        
-        Expected: Neutral
+        WHY: Без ATR _calculate_outcome() возвращает Neutral до settling и запроса
+        цен - Grim Reaper не тянет 7 дней market_metrics_full на каждый такой айсберг.
         """
-        # Arrange
-        repo = PostgresRepository(dsn="mock")
-        
+        class FailingConn:
+            async def fetch(self, query, *args):
+                raise AssertionError("fetch() не должен вызываться без ATR")
+
+        # WHY: Без event_time - settling тоже не должен начинаться
         iceberg_data = {
             'id': 'test-uuid',
             'symbol': 'BTCUSDT',
             'price': Decimal('60000'),
             'is_ask': False,
-            'event_time': datetime(2025, 1, 1),
-            'volatility_at_entry': 0.0
+            'volatility_at_entry': atr
         }
-        
-        # Act
-        outcome = await repo._calculate_outcome(mock_conn, iceberg_data)
-        
-        # Assert
-        assert outcome == 0
 
+        assert await repo._calculate_outcome(FailingConn(), iceberg_data) == 0
 
-    @pytest.mark.asyncio
-    async def test_panic_absorption_no_settling_delay(self, mock_conn):
+    async def test_panic_absorption_no_settling_delay(self, repo, mock_conn):
         """
         WHY: Тест PANIC ABSORPTION - high VPIN НО minnows panic = NO delay.
         
@@ -278,8 +171,6 @@ class TestCalculateOutcome:
         - V-shape recovery должен быть засчитан как Win
         """
         # Arrange
-        repo = PostgresRepository(dsn="mock")
-        
         # WHY: Panic Absorption scenario
         iceberg_data = {
             'id': 'test-uuid',
@@ -310,8 +201,7 @@ class TestCalculateOutcome:
         # Assert
         assert outcome == 1, "Expected Win - panic absorption should enter immediately and catch V-shape"
     
-    @pytest.mark.asyncio
-    async def test_whale_attack_with_settling_delay(self, mock_conn):
+    async def test_whale_attack_with_settling_delay(self, repo, mock_conn):
         """
         WHY: Тест WHALE ATTACK - high VPIN НО whales attacking = WAIT.
         
@@ -325,8 +215,6 @@ class TestCalculateOutcome:
         - Шум ДО settling игнорируется
         """
         # Arrange
-        repo = PostgresRepository(dsn="mock")
-        
         # WHY: Whale Attack scenario  
         iceberg_data = {
             'id': 'test-uuid',
@@ -367,7 +255,6 @@ class TestGrimReaperIntegration:
     """Интеграционные тесты (требуют реальную БД)"""
     
     @pytest.mark.skip(reason="Requires PostgreSQL database")
-    @pytest.mark.asyncio
     async def test_run_grim_reaper_labels_old_icebergs(self):
         """
         WHY: Полный тест Grim Reaper workflow.
@@ -103,12 +103,14 @@ def test_downsample_to_higher_timeframes():
     memory = HistoricalMemory()
     base_time = datetime.now() - timedelta(hours=200)  # Начинаем 200 часов назад
     
-    # Добавляем по 1 точке каждый час (200 точек)
-    for i in range(200):
-        timestamp = base_time + timedelta(hours=i)
-        whale_cvd = 1000.0 + i * 10  # CVD растет
-        price = Decimal("95000") + Decimal(i * 5)  # Цена растет
-        
+    # WHY: Ряды строим заранее - цикл ниже только кормит update_history()
+    hour = timedelta(hours=1)
+    timestamps = [base_time + hour * i for i in range(200)]  # По 1 точке каждый час (200 точек)
+    whale_cvds = [1000.0 + i * 10 for i in range(200)]  # CVD растет
+    base_price = Decimal("95000")
+    prices = [base_price + i * 5 for i in range(200)]  # Цена растет
+    
+    for timestamp, whale_cvd, price in zip(timestamps, whale_cvds, prices):
         memory.update_history(timestamp, whale_cvd, -whale_cvd * 0.5, price)  # WHY: minnow_cvd противоположен whale
     
     # ПРОВЕРКА: 1H хранит только последние 60 часов
@@ -1,6 +1,8 @@
 import asyncio
+import logging
 from decimal import Decimal
-from typing import AsyncGenerator, Dict, Any
+from contextlib import suppress
+from typing import AsyncGenerator, Awaitable, Callable, Dict, Any
 
 # Импортируем ваши классы (убедитесь, что имена файлов совпадают с импортами)
 # Если ваши файлы называются domain.py, infrastructure.py - исправьте тут
@@ -8,15 +10,57 @@ from domain import OrderBookUpdate, TradeEvent
 from infrastructure import IMarketDataSource
 from services import TradingEngine
 
+# WHY: События сценария - отладочный след, а не результат теста.
+# По умолчанию молчат; видны при DEBUG (ручной запуск или caplog.set_level)
+logger = logging.getLogger(__name__)
+
 class IcebergScenarioMock(IMarketDataSource):
     """
     Сценарный Мок.
     Генерирует строго заданную последовательность для проверки математики айсберга.
+    
+    WHY: Порядок задаётся не паузами, а очередями: события лежат в очередях
+    и отдаются только после того, как движок забрал снапшот (lastUpdateId=100).
+    Дальше TradingEngine сам отсекает deltas <= lastUpdateId, а ReorderingBuffer
+    упорядочивает Trade/Depth по event_time.
+    
+    sleep - пауза "сети" перед ответом снапшота; в тесте подменяется мгновенной.
     """
     
+    def __init__(self, sleep: Callable[[float], Awaitable[None]] = asyncio.sleep):
+        self._sleep = sleep
+        self._snapshot_served = asyncio.Event()
+        self._closed = asyncio.Event()  # WHY: держит поток открытым без периодических пробуждений
+        self._trades: asyncio.Queue = asyncio.Queue()
+        self._updates: asyncio.Queue = asyncio.Queue()
+        
+        # 2. Продажа в бид: агрессор продал 5 монет
+        self._trades.put_nowait(TradeEvent(
+            price=Decimal("60000.00"),
+            quantity=Decimal("5.0"),     # Агрессор продал 5 монет
+            is_buyer_maker=True,         # True = Maker (Bid) покупал, значит Taker продавал
+            event_time=1638747660000
+        ))
+        
+        # 3. Depth Update сразу за снапшотом (101 = lastUpdateId + 1)
+        self._updates.put_nowait(OrderBookUpdate(
+            first_update_id=101,
+            final_update_id=102,
+            # Биржа говорит: осталось 9 BTC.
+            # Хотя продали 5 BTC. Значит 4 BTC было подложено.
+            bids=[(Decimal("60000.00"), Decimal("9.0"))], 
+            asks=[],
+            event_time=1638747660050  # +50ms после сделки
+        ))
+    
+    def close(self) -> None:
+        """Закрывает "соединение" - listen_updates() завершается"""
+        self._closed.set()
+    
     async def get_snapshot(self, symbol: str) -> Dict[str, Any]:
-        print("🎭 [TEST] 1. Отправляем снапшот: Bid 60000 c объемом 10 BTC")
-        await asyncio.sleep(0.1)
+        logger.debug("🎭 [TEST] 1. Отправляем снапшот: Bid 60000 c объемом 10 BTC")
+        await self._sleep(0.1)
+        self._snapshot_served.set()
         return {
             'bids': [(Decimal("60000.00"), Decimal("10.0"))], # Здесь стоит плита
             'asks': [(Decimal("60100.00"), Decimal("5.0"))],
@@ -26,37 +70,64 @@ class IcebergScenarioMock(IMarketDataSource):
     async def listen_updates(self, symbol: str) -> AsyncGenerator[OrderBookUpdate, None]:
         """Эмулируем поведение биржи после сделки"""
         
-        # Ждем, пока движок инициализируется (он ждет 2 сек буферизации)
-        await asyncio.sleep(3) 
+        # Ждем, пока движок заберет снапшот (после буферизации)
+        await self._snapshot_served.wait()
         
-        print(f"🎭 [TEST] 3. Отправляем Depth Update: Объем упал с 10.0 до 9.0 (изменение всего 1 BTC)")
-        yield OrderBookUpdate(
-            first_update_id=101,
-            final_update_id=102,
-            # Биржа говорит: осталось 9 BTC.
-            # Хотя продали 5 BTC. Значит 4 BTC было подложено.
-            bids=[(Decimal("60000.00"), Decimal("9.0"))], 
-            asks=[]
-        )
+        while not self._updates.empty():
+            logger.debug("🎭 [TEST] 3. Отправляем Depth Update: Объем упал с 10.0 до 9.0 (изменение всего 1 BTC)")
+            yield self._updates.get_nowait()
         
-        # Держим соединение открытым
-        while True:
-            await asyncio.sleep(1)
+        # Держим соединение открытым до close()
+        await self._closed.wait()
 
     async def listen_trades(self, symbol: str) -> AsyncGenerator[TradeEvent, None]:
         """Эмулируем продажу в бид"""
         
-        # Ждем инициализации + чуть меньше, чем depth update, 
-        # чтобы сделка пришла чуть раньше (или попала в обработку вместе)
-        await asyncio.sleep(2.5)
+        await self._snapshot_served.wait()
         
-        print(f"🎭 [TEST] 2. Отправляем TRADE: Продажа 5.0 BTC по 60000")
-        yield TradeEvent(
-            price=Decimal("60000.00"),
-            quantity=Decimal("5.0"),     # Агрессор продал 5 монет
-            is_buyer_maker=True,         # True = Maker (Bid) покупал, значит Taker продавал
-            event_time=1638747660000
-        )
+        while not self._trades.empty():
+            logger.debug("🎭 [TEST] 2. Отправляем TRADE: Продажа 5.0 BTC по 60000")
+            yield self._trades.get_nowait()
+
+async def _instant_sleep(delay: float) -> None:
+    """WHY: Сценарий упорядочен очередями - паузу мока заменяем одним переключением loop"""
+    await asyncio.sleep(0)
+
+
+async def _wait_scenario_processed(engine: TradingEngine) -> None:
+    """Ждёт, пока Depth Update применён, а Trade и Depth прошли через ReorderingBuffer"""
+    while not (
+        engine.book.last_update_id == 102
+        and engine.trade_queue.empty()
+        and engine.depth_queue.empty()
+        and not engine.buffer.buffer
+    ):
+        await asyncio.sleep(0.01)
+
+
+async def test_iceberg_scenario_runs_to_completion():
+    """
+    Сценарий целиком через TradingEngine.run(): снапшот -> Trade -> Depth Update.
+    
+    WHY: У TradingEngine нет stop() - дожидаемся обработки обоих событий
+    и отменяем run(). Реальное время тратится только на буферизацию движка (2s).
+    """
+    mock_infra = IcebergScenarioMock(sleep=_instant_sleep)
+    engine = TradingEngine("BTCUSDT", mock_infra)
+    
+    run_task = asyncio.create_task(engine.run())
+    try:
+        await asyncio.wait_for(_wait_scenario_processed(engine), timeout=10.0)
+    finally:
+        mock_infra.close()
+        run_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await run_task
+    
+    assert engine.is_initialized
+    # Биржа прислала 9 BTC на уровне 60000 после продажи 5 BTC из 10
+    assert engine.book.bids[Decimal("60000.00")] == Decimal("9.0")
+
 
 async def main():
     print("--- ЗАПУСК ТЕСТА НА АЙСБЕРГ ---\n")
@@ -68,10 +139,14 @@ async def main():
     engine = TradingEngine("BTCUSDT", mock_infra)
     
     # 3. Запускаем (с таймаутом, чтобы тест не висел вечно)
+    # WHY: У TradingEngine нет stop() - таймаут задаёт окно наблюдения сценария
     try:
         await asyncio.wait_for(engine.run(), timeout=6.0)
     except asyncio.TimeoutError:
         print("\n--- ТЕСТ ЗАВЕРШЕН (Timeout) ---")
+    finally:
+        mock_infra.close()
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    logging.basicConfig(level=logging.DEBUG, format='%(message)s')
+    asyncio.run(main())
@@ -10,142 +10,83 @@ Reference: Gemini recommendation 2.2 Gap Detection
 import pytest
 from decimal import Decimal
 from datetime import datetime, timedelta
-from domain import LocalOrderBook, IcebergLevel, IcebergStatus
+from domain import LocalOrderBook, IcebergLevel, IcebergStatus, OrderBookUpdate
 from config import BTC_CONFIG
 
 
-def test_reconcile_removes_ghost_icebergs():
-    """
-    WHY: После resync айсберги, отсутствующие в новом снапшоте, должны быть INVALIDATED
-    
-    Scenario:
-    1. Before resync: Iceberg at 60000 (BID)
-    2. Network disconnect → iceberg cancelled by trader
-    3. After resync: Snapshot has no liquidity at 60000
-    4. Expected: Iceberg marked as INVALIDATED (not ACTIVE)
-    """
-    # Setup
-    book = LocalOrderBook(symbol="BTCUSDT", config=BTC_CONFIG)
-    
-    # Register iceberg BEFORE resync
-    book.register_iceberg(
-        price=Decimal("60000.00"),
-        hidden_vol=Decimal("10.0"),
-        is_ask=False,  # BID iceberg
-        confidence=0.85
-    )
-    
-    # Verify it's active
-    iceberg = book.get_iceberg_at_price(Decimal("60000.00"), is_ask=False)
-    assert iceberg is not None
-    assert iceberg.status == IcebergStatus.ACTIVE
-    
-    # RESYNC: New snapshot without this level
-    new_snapshot_bids = [
-        (Decimal("59900.00"), Decimal("5.0")),  # Different price
-        (Decimal("59800.00"), Decimal("3.0"))
-    ]
-    new_snapshot_asks = [
-        (Decimal("60100.00"), Decimal("2.0"))
-    ]
-    
-    # ACT: Reconcile
-    book.reconcile_with_snapshot(new_snapshot_bids, new_snapshot_asks)
-    
-    # ASSERT: Ghost iceberg is INVALIDATED
-    iceberg_after = book.get_iceberg_at_price(Decimal("60000.00"), is_ask=False)
-    assert iceberg_after is not None, "Iceberg should still exist in registry"
-    assert iceberg_after.status == IcebergStatus.CANCELLED, "Should be marked CANCELLED (not in snapshot)"
-
-
-def test_reconcile_preserves_active_icebergs():
-    """
-    WHY: Айсберги, которые ЕСТЬ в новом снапшоте, должны остаться ACTIVE
-    
-    Scenario:
-    1. Iceberg at 60000 with 10 BTC hidden volume
-    2. Resync → snapshot shows 15 BTC at 60000 (iceberg still there)
-    3. Expected: Iceberg remains ACTIVE
-    """
-    book = LocalOrderBook(symbol="BTCUSDT", config=BTC_CONFIG)
-    
-    # Register iceberg
-    book.register_iceberg(
-        price=Decimal("60000.00"),
-        hidden_vol=Decimal("10.0"),
-        is_ask=False,
-        confidence=0.85
-    )
-    
-    # RESYNC: Snapshot HAS this level with significant volume
-    new_snapshot_bids = [
-        (Decimal("60000.00"), Decimal("15.0")),  # Still there
-        (Decimal("59900.00"), Decimal("5.0"))
-    ]
-    new_snapshot_asks = []
-    
-    # ACT
-    book.reconcile_with_snapshot(new_snapshot_bids, new_snapshot_asks)
-    
-    # ASSERT: Still active
-    iceberg = book.get_iceberg_at_price(Decimal("60000.00"), is_ask=False)
-    assert iceberg.status == IcebergStatus.ACTIVE
+# WHY: Decimal неизменяем - парсим повторяющиеся литералы один раз на модуль
+_PX_60K = Decimal("60000.00")
+_PX_60100 = Decimal("60100.00")
+_PX_59900 = Decimal("59900.00")
+_PX_59000 = Decimal("59000.00")
+_QTY_10 = Decimal("10.0")
+_QTY_5 = Decimal("5.0")
+_QTY_3 = Decimal("3.0")
+_QTY_2 = Decimal("2.0")
 
 
-def test_reconcile_invalidates_zero_volume_levels():
+@pytest.mark.parametrize("icebergs, snapshot_bids, snapshot_asks, expected_status", [
+    # Ghost: Network disconnect → айсберг отменён трейдером, в снапшоте нет уровня 60000
+    pytest.param(
+        [(_PX_60K, _QTY_10, False, 0.85)],
+        [(_PX_59900, _QTY_5), (Decimal("59800.00"), _QTY_3)],
+        [(_PX_60100, _QTY_2)],
+        IcebergStatus.CANCELLED,
+        id="ghost_iceberg_cancelled",
+    ),
+    # Снапшот показывает 15 BTC на 60000 - айсберг всё ещё стоит
+    pytest.param(
+        [(_PX_60K, _QTY_10, False, 0.85)],
+        [(_PX_60K, Decimal("15.0")), (_PX_59900, _QTY_5)],
+        [],
+        IcebergStatus.ACTIVE,
+        id="present_level_stays_active",
+    ),
+    # Уровень есть, но объем ничтожно мал (не выше dust_threshold BTC_CONFIG) →
+    # айсберг истощился или отменен
+    pytest.param(
+        [(_PX_60K, _QTY_10, True, 0.90)],
+        [],
+        [(_PX_60K, Decimal("0.0001"))],
+        IcebergStatus.CANCELLED,
+        id="dust_volume_cancelled",
+    ),
+    # Edge case: биржа вернула пустые массивы (API error / экстремально низкая ликвидность)
+    pytest.param(
+        [(_PX_60K, _QTY_5, False, 0.8), (_PX_60100, _QTY_3, True, 0.75)],
+        [],
+        [],
+        IcebergStatus.CANCELLED,
+        id="empty_snapshot_cancels_all",
+    ),
+])
+def test_reconcile_with_snapshot(icebergs, snapshot_bids, snapshot_asks, expected_status):
     """
-    WHY: Если в снапшоте уровень есть, но объем ничтожно мал (< dust_threshold),
-         это значит айсберг истощился или отменен
+    WHY: После resync айсберги, отсутствующие в новом снапшоте (или с dust объемом),
+    должны быть CANCELLED, а присутствующие - остаться ACTIVE.
     
     Scenario:
-    1. Iceberg at 60000 (10 BTC hidden)
-    2. Resync → snapshot shows 0.0001 BTC at 60000 (dust < 0.001 threshold)
-    3. Expected: INVALIDATED (volume too low to be real iceberg)
+    1. Before resync: регистрируем айсберги
+    2. Network glitch → WebSocket reconnect → новый снапшот
+    3. reconcile_with_snapshot()
+    4. Expected: статус каждого айсберга = expected_status
     """
     book = LocalOrderBook(symbol="BTCUSDT", config=BTC_CONFIG)
     
-    book.register_iceberg(
-        price=Decimal("60000.00"),
-        hidden_vol=Decimal("10.0"),
-        is_ask=True,  # ASK iceberg
-        confidence=0.90
-    )
-    
-    # RESYNC: Price exists but volume is dust (BELOW threshold)
-    new_snapshot_bids = []
-    new_snapshot_asks = [
-        (Decimal("60000.00"), Decimal("0.0001"))  # Dust volume (< 0.001 BTC_CONFIG threshold)
-    ]
+    # Register icebergs BEFORE resync
+    for price, hidden_vol, is_ask, confidence in icebergs:
+        book.register_iceberg(price, hidden_vol, is_ask=is_ask, confidence=confidence)
+        assert book.get_iceberg_at_price(price, is_ask=is_ask).status == IcebergStatus.ACTIVE
     
-    # ACT
-    book.reconcile_with_snapshot(new_snapshot_bids, new_snapshot_asks)
+    # ACT: Reconcile
+    book.reconcile_with_snapshot(snapshot_bids, snapshot_asks)
     
     # ASSERT
-    iceberg = book.get_iceberg_at_price(Decimal("60000.00"), is_ask=True)
-    assert iceberg.status == IcebergStatus.CANCELLED, "Dust volume should invalidate iceberg"
-
-
-def test_reconcile_handles_empty_snapshot():
-    """
-    WHY: Edge case - полностью пустой снапшот (биржа вернула пустые массивы)
-    
-    Scenario:
-    1. Multiple icebergs registered
-    2. Resync → snapshot is empty (exchange API error or extreme low liquidity)
-    3. Expected: ALL icebergs INVALIDATED
-    """
-    book = LocalOrderBook(symbol="BTCUSDT", config=BTC_CONFIG)
-    
-    # Register multiple icebergs
-    book.register_iceberg(Decimal("60000.00"), Decimal("5.0"), is_ask=False, confidence=0.8)
-    book.register_iceberg(Decimal("60100.00"), Decimal("3.0"), is_ask=True, confidence=0.75)
-    
-    # RESYNC: Empty snapshot
-    book.reconcile_with_snapshot(bids=[], asks=[])
-    
-    # ASSERT: All invalidated
-    for level in book.active_icebergs.values():
-        assert level.status == IcebergStatus.CANCELLED
+    for price, _, is_ask, _ in icebergs:
+        iceberg = book.get_iceberg_at_price(price, is_ask=is_ask)
+        assert iceberg is not None, "Iceberg should still exist in registry"
+        assert iceberg.status == expected_status, \
+            f"Iceberg at {price} should be {expected_status}, got {iceberg.status}"
 
 
 def test_reconcile_only_affects_icebergs_not_orderbook():
@@ -162,16 +103,15 @@ def test_reconcile_only_affects_icebergs_not_orderbook():
     
     # Initialize book with snapshot FIRST (to avoid GapDetectedError)
     book.apply_snapshot(
-        bids=[(Decimal("60000.00"), Decimal("10.0"))],
-        asks=[(Decimal("60100.00"), Decimal("5.0"))],
+        bids=[(_PX_60K, _QTY_10)],
+        asks=[(_PX_60100, _QTY_5)],
         last_update_id=99
     )
     
     # Then apply update
-    from domain import OrderBookUpdate
     update = OrderBookUpdate(
-        bids=[(Decimal("60000.00"), Decimal("10.0"))],
-        asks=[(Decimal("60100.00"), Decimal("5.0"))],
+        bids=[(_PX_60K, _QTY_10)],
+        asks=[(_PX_60100, _QTY_5)],
         first_update_id=100,
         final_update_id=100,
         event_time=1000  # FIX: Required field
@@ -179,20 +119,20 @@ def test_reconcile_only_affects_icebergs_not_orderbook():
     book.apply_update(update)
     
     # Register iceberg
-    book.register_iceberg(Decimal("59000.00"), Decimal("2.0"), is_ask=False, confidence=0.7)
+    book.register_iceberg(_PX_59000, _QTY_2, is_ask=False, confidence=0.7)
     
     # Store original book state
-    original_bid_volume = book.bids[Decimal("60000.00")]
+    original_bid_volume = book.bids[_PX_60K]
     
     # RESYNC: Snapshot without iceberg level but with order book data
     book.reconcile_with_snapshot(
-        bids=[(Decimal("60000.00"), Decimal("10.0"))],  # Same as before
-        asks=[(Decimal("60100.00"), Decimal("5.0"))]
+        bids=[(_PX_60K, _QTY_10)],  # Same as before
+        asks=[(_PX_60100, _QTY_5)]
     )
     
     # ASSERT: Order book unchanged
-    assert book.bids[Decimal("60000.00")] == original_bid_volume
+    assert book.bids[_PX_60K] == original_bid_volume
     
     # ASSERT: Iceberg invalidated
-    iceberg = book.get_iceberg_at_price(Decimal("59000.00"), is_ask=False)
+    iceberg = book.get_iceberg_at_price(_PX_59000, is_ask=False)
     assert iceberg.status == IcebergStatus.CANCELLED
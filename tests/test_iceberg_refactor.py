@@ -14,7 +14,48 @@ import pytest
 from decimal import Decimal
 from domain import LocalOrderBook, TradeEvent
 from analyzers import IcebergAnalyzer
-from config import BTC_CONFIG
+from config import BTC_CONFIG, SOL_CONFIG
+
+
+# WHY: Decimal неизменяем - парсим повторяющиеся литералы один раз на модуль
+_PX_95K = Decimal("95000.00")
+_PX_95001 = Decimal("95001.00")
+_QTY_1 = Decimal("1.0")
+_QTY_1_5 = Decimal("1.5")
+_QTY_2 = Decimal("2.0")
+
+
+@pytest.fixture(scope="module")
+def analyzer():
+    """WHY: IcebergAnalyzer хранит только config - один экземпляр на модуль"""
+    return IcebergAnalyzer(config=BTC_CONFIG)
+
+
+@pytest.fixture(scope="module")
+def sol_analyzer():
+    return IcebergAnalyzer(config=SOL_CONFIG)
+
+
+def _make_book(symbol, config, bids, asks, last_update_id):
+    """
+    WHY: Книга - свежая на каждый вызов:
+    analyze_with_timing() регистрирует айсберг в book.active_icebergs.
+    Заполняем стакан через apply_snapshot (не прямое присваивание).
+    """
+    book = LocalOrderBook(symbol=symbol, config=config)
+    book.apply_snapshot(bids=bids, asks=asks, last_update_id=last_update_id)
+    return book
+
+
+@pytest.fixture
+def book():
+    # Реалистичный стакан: bid=95000, ask=95001
+    return _make_book(
+        "BTCUSDT", BTC_CONFIG,
+        bids=[(_PX_95K, _QTY_1), (Decimal("94999.00"), _QTY_2)],
+        asks=[(_PX_95001, _QTY_1), (Decimal("95002.00"), _QTY_2)],
+        last_update_id=1000
+    )
 
 
 class TestNativeSyntheticSplit:
@@ -25,20 +66,7 @@ class TestNativeSyntheticSplit:
     и false positives для Synthetic. Нужно 2 независимых пути.
     """
     
-    def setup_method(self):
-        """Подготовка для каждого теста"""
-        self.book = LocalOrderBook(symbol="BTCUSDT")
-        self.analyzer = IcebergAnalyzer(config=BTC_CONFIG)
-        
-        # WHY: Заполняем стакан через apply_snapshot (не прямое присваивание)
-        # Создаем реалистичный стакан: bid=95000, ask=95001
-        self.book.apply_snapshot(
-            bids=[(Decimal("95000.00"), Decimal("1.0")), (Decimal("94999.00"), Decimal("2.0"))],
-            asks=[(Decimal("95001.00"), Decimal("1.0")), (Decimal("95002.00"), Decimal("2.0"))],
-            last_update_id=1000
-        )
-    
-    def test_native_iceberg_fast_refill(self):
+    def test_native_iceberg_fast_refill(self, book, analyzer):
         """
         TEST A: Native айсберг (delta_t=3ms)
         
@@ -57,20 +85,20 @@ class TestNativeSyntheticSplit:
         """
         # Arrange: Создаём сделку
         trade = TradeEvent(
-            price=Decimal("95000.00"),
-            quantity=Decimal("1.5"),  # Больше visible
+            price=_PX_95K,
+            quantity=_QTY_1_5,  # Больше visible
             is_buyer_maker=True,
             event_time=1000000,  # ms
             trade_id=123
         )
         
-        visible_before = Decimal("1.0")  # Видимый объем ДО сделки
+        visible_before = _QTY_1  # Видимый объем ДО сделки
         delta_t_ms = 3  # NATIVE: очень быстрый refill
         update_time_ms = 1000003  # 3ms после trade
         
         # Act: Вызываем анализатор
-        result = self.analyzer.analyze_with_timing(
-            book=self.book,
+        result = analyzer.analyze_with_timing(
+            book=book,
             trade=trade,
             visible_before=visible_before,
             delta_t_ms=delta_t_ms,
@@ -86,9 +114,9 @@ class TestNativeSyntheticSplit:
             f"confidence >= 0.95, получили {result.confidence}"
         )
         assert result.detected_hidden_volume == Decimal("0.5")
-        assert result.price == Decimal("95000.00")
+        assert result.price == _PX_95K
     
-    def test_synthetic_iceberg_medium_refill(self):
+    def test_synthetic_iceberg_medium_refill(self, book, analyzer):
         """
         TEST B: Synthetic айсберг (delta_t=30ms)
         
@@ -108,20 +136,20 @@ class TestNativeSyntheticSplit:
         """
         # Arrange: Создаём сделку
         trade = TradeEvent(
-            price=Decimal("95000.00"),
-            quantity=Decimal("2.0"),  # Больше visible
+            price=_PX_95K,
+            quantity=_QTY_2,  # Больше visible
             is_buyer_maker=False,  # ASK iceberg
             event_time=2000000,
             trade_id=456
         )
         
-        visible_before = Decimal("1.0")
+        visible_before = _QTY_1
         delta_t_ms = 30  # SYNTHETIC: средняя задержка (точка cutoff)
         update_time_ms = 2000030
         
         # Act
-        result = self.analyzer.analyze_with_timing(
-            book=self.book,
+        result = analyzer.analyze_with_timing(
+            book=book,
             trade=trade,
             visible_before=visible_before,
             delta_t_ms=delta_t_ms,
@@ -147,10 +175,10 @@ class TestNativeSyntheticSplit:
             f"получили {result.confidence}"
         )
         
-        assert result.detected_hidden_volume == Decimal("1.0")
-        assert result.price == Decimal("95000.00")
+        assert result.detected_hidden_volume == _QTY_1
+        assert result.price == _PX_95K
     
-    def test_too_slow_rejected(self):
+    def test_too_slow_rejected(self, book, analyzer):
         """
         TEST C: Слишком медленный refill отклоняется
         
@@ -161,20 +189,20 @@ class TestNativeSyntheticSplit:
         - Возвращает None (событие отклонено)
         """
         trade = TradeEvent(
-            price=Decimal("95000.00"),
-            quantity=Decimal("1.5"),
+            price=_PX_95K,
+            quantity=_QTY_1_5,
             is_buyer_maker=True,
             event_time=3000000,
             trade_id=789
         )
         
-        visible_before = Decimal("1.0")
+        visible_before = _QTY_1
         delta_t_ms = 60  # СЛИШКОМ МЕДЛЕННО (> 50ms)
         update_time_ms = 3000060
         
         # Act
-        result = self.analyzer.analyze_with_timing(
-            book=self.book,
+        result = analyzer.analyze_with_timing(
+            book=book,
             trade=trade,
             visible_before=visible_before,
             delta_t_ms=delta_t_ms,
@@ -189,7 +217,7 @@ class TestNativeSyntheticSplit:
             f"но вернул {result}"
         )
     
-    def test_config_override_multi_asset(self):
+    def test_config_override_multi_asset(self, analyzer, sol_analyzer):
         """
         TEST D (Gemini Recommendation): Config Override для мульти-ассет
         
@@ -207,8 +235,6 @@ class TestNativeSyntheticSplit:
         
         Если тест падает: analyzer использует hardcoded значения!
         """
-        from config import SOL_CONFIG
-        
         # Arrange: Одинаковая сделка для обоих конфигов
         trade = TradeEvent(
             price=Decimal("180.50"),  # SOL цена (реалистичнее)
@@ -223,15 +249,14 @@ class TestNativeSyntheticSplit:
         update_time_ms = 4000008
         
         # === BTC ANALYZER (native_refill_max_ms=5) ===
-        btc_book = LocalOrderBook(symbol="BTCUSDT", config=BTC_CONFIG)
-        btc_book.apply_snapshot(
-            bids=[(Decimal("95000.00"), Decimal("1.0"))],
-            asks=[(Decimal("95001.00"), Decimal("1.0"))],
+        btc_book = _make_book(
+            "BTCUSDT", BTC_CONFIG,
+            bids=[(_PX_95K, _QTY_1)],
+            asks=[(_PX_95001, _QTY_1)],
             last_update_id=1000
         )
-        btc_analyzer = IcebergAnalyzer(config=BTC_CONFIG)
         
-        btc_result = btc_analyzer.analyze_with_timing(
+        btc_result = analyzer.analyze_with_timing(
             book=btc_book,
             trade=trade,
             visible_before=visible_before,
@@ -242,13 +267,12 @@ class TestNativeSyntheticSplit:
         )
         
         # === SOL ANALYZER (native_refill_max_ms=10) ===
-        sol_book = LocalOrderBook(symbol="SOLUSDT", config=SOL_CONFIG)
-        sol_book.apply_snapshot(
-            bids=[(Decimal("180.00"), Decimal("1.0"))],
-            asks=[(Decimal("181.00"), Decimal("1.0"))],
+        sol_book = _make_book(
+            "SOLUSDT", SOL_CONFIG,
+            bids=[(Decimal("180.00"), _QTY_1)],
+            asks=[(Decimal("181.00"), _QTY_1)],
             last_update_id=2000
         )
-        sol_analyzer = IcebergAnalyzer(config=SOL_CONFIG)
         
         sol_result = sol_analyzer.analyze_with_timing(
             book=sol_book,
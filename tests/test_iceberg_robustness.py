@@ -5,6 +5,11 @@ from domain import LocalOrderBook, TradeEvent, IcebergDetectionResult
 from analyzers import IcebergAnalyzer
 from config import BTC_CONFIG
 
+# WHY: Decimal неизменяем - парсим повторяющиеся литералы один раз на модуль
+_PX_60K = Decimal("60000")
+_QTY_10 = Decimal("10.0")
+_QTY_2 = Decimal("2.0")
+
 class TestIcebergRobustness(unittest.TestCase):
     
     def setUp(self):
@@ -13,24 +18,24 @@ class TestIcebergRobustness(unittest.TestCase):
         self.analyzer = IcebergAnalyzer(BTC_CONFIG)
         
         # Имитируем стакан: цена 60000, объем 10.0
-        self.book.bids = {Decimal("60000"): Decimal("10.0")}
+        self.book.bids = {_PX_60K: _QTY_10}
         self.book.asks = {}  # Инициализируем пустой ask
 
     def test_normal_trade_no_iceberg(self):
         """Тест 1: Обычная сделка, объемы совпадают идеально"""
         trade = TradeEvent(
-            price=Decimal("60000"), 
-            quantity=Decimal("2.0"), 
+            price=_PX_60K, 
+            quantity=_QTY_2, 
             is_buyer_maker=True, 
             event_time=1000
         )
         
         # WHY: Используем новый API - analyzer.analyze()
-        visible_before = Decimal("10.0")
+        visible_before = _QTY_10
         result = self.analyzer.analyze(self.book, trade, visible_before)
         
         # Обновляем стакан: 10.0 - 2.0 = 8.0
-        self.book.bids[Decimal("60000")] = Decimal("8.0")
+        self.book.bids[_PX_60K] = Decimal("8.0")
         
         # Проверяем: нет скрытого объема (2.0 <= 10.0)
         self.assertIsNone(result, "Обычная сделка не должна детектироваться как айсберг")
@@ -38,15 +43,15 @@ class TestIcebergRobustness(unittest.TestCase):
     def test_liquidity_added_during_trade(self):
         """Тест 2: Кто-то добавил ликвидность (стакан вырос вопреки продаже)"""
         trade = TradeEvent(
-            price=Decimal("60000"), 
-            quantity=Decimal("2.0"), 
+            price=_PX_60K, 
+            quantity=_QTY_2, 
             is_buyer_maker=True, 
             event_time=1000
         )
         
         # Было 10.0, продали 2.0, но кто-то добавил 5.0 → стало 13.0
         # Это НЕ айсберг, так как visible_after > visible_before
-        visible_before = Decimal("10.0")
+        visible_before = _QTY_10
         result = self.analyzer.analyze(self.book, trade, visible_before)
         
         # WHY: Сделка 2.0 меньше visible_before 10.0 → нет айсберга
@@ -56,13 +61,13 @@ class TestIcebergRobustness(unittest.TestCase):
         """Тест 3: Детекция скрытого объема"""
         # WHY: Случай, когда trade.quantity > visible_before
         trade = TradeEvent(
-            price=Decimal("60000"),
+            price=_PX_60K,
             quantity=Decimal("15.0"),  # Больше чем visible (10.0)
             is_buyer_maker=True,
             event_time=1000
         )
         
-        visible_before = Decimal("10.0")
+        visible_before = _QTY_10
         result = self.analyzer.analyze(self.book, trade, visible_before)
         
         # Проверяем: должен обнаружить hidden_volume = 15.0 - 10.0 = 5.0
@@ -70,5 +75,39 @@ class TestIcebergRobustness(unittest.TestCase):
         self.assertEqual(result.detected_hidden_volume, Decimal("5.0"), 
                         "Скрытый объем должен быть 5.0")
 
+    def test_hidden_volume_thresholds(self):
+        """
+        Тест 4: Пороги BTC_CONFIG вокруг visible_before = 10.0.
+        
+        min_hidden_volume = 0.05 (строго больше), min_iceberg_ratio = 0.3
+        (hidden / qty строго больше). Ожидания посчитаны вручную.
+        """
+        cases = [
+            # (quantity, expected hidden или None)
+            ("10.0", None),     # hidden = 0
+            ("10.05", None),    # hidden = 0.05 - не больше min_hidden_volume
+            ("14.0", None),     # hidden = 4.0, ratio = 4/14 ≈ 0.286 < 0.3
+            ("14.3", "4.3"),    # ratio = 4.3/14.3 ≈ 0.301 > 0.3
+            ("100.0", "90.0"),  # ratio = 0.9
+        ]
+        for qty, expected_hidden in cases:
+            with self.subTest(quantity=qty):
+                # WHY: register_iceberg() накапливает объём - книга своя на кейс
+                book = LocalOrderBook(symbol="BTCUSDT")
+                trade = TradeEvent(
+                    price=_PX_60K,
+                    quantity=Decimal(qty),
+                    is_buyer_maker=True,
+                    event_time=1000
+                )
+                
+                result = self.analyzer.analyze(book, trade, _QTY_10)
+                
+                if expected_hidden is None:
+                    self.assertIsNone(result)
+                else:
+                    self.assertIsNotNone(result)
+                    self.assertEqual(result.detected_hidden_volume, Decimal(expected_hidden))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
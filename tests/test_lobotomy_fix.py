@@ -23,11 +23,55 @@ WHY: Проверяет что FeatureCollector получает все необ
     ⚠️ flow_analyzer=None (НО это OK - CVD читается из book.whale_cvd)
 """
 
+import logging
 import pytest
 from services import TradingEngine
 from infrastructure import BinanceInfrastructure
 from config import get_config
 from decimal import Decimal
+from dataclasses import fields
+from domain import GammaProfile, VolumeBucket, IcebergLevel
+from analyzers_features import FeatureSnapshot
+from analyzers_derivatives import DerivativesAnalyzer
+from analyzers import SpoofingAnalyzer, FlowToxicityAnalyzer, GammaProvider  # FIX: GammaProvider теперь в analyzers.py
+
+
+# WHY: Диагностика снапшотов - одно debug-сообщение на тест вместо десятков print()
+# через capture-буфер pytest. Показать: pytest --log-cli-level=DEBUG
+logger = logging.getLogger(__name__)
+
+# WHY: fields() фильтрует __dataclass_fields__ на каждом вызове - имена полей
+# снапшота берём один раз на модуль
+_SNAPSHOT_FIELD_NAMES = tuple(f.name for f in fields(FeatureSnapshot))
+
+# WHY: Уровни стакана собираем один раз на модуль - тесты кладут их через update()
+# Минимальный стакан: 2 уровня bid/ask
+_MIN_BID_LEVELS = ((Decimal("50000"), Decimal("1.5")), (Decimal("49900"), Decimal("2.0")))
+_MIN_ASK_LEVELS = ((Decimal("50100"), Decimal("1.8")), (Decimal("50200"), Decimal("2.2")))
+# Полный стакан: 10 уровней с шагом 100, объём растёт на 0.1 на уровень
+_FULL_BID_LEVELS = tuple(
+    (Decimal(50000 - i * 100), Decimal("1.5") + Decimal(i) / 10) for i in range(10)
+)
+_FULL_ASK_LEVELS = tuple(
+    (Decimal(50100 + i * 100), Decimal("1.8") + Decimal(i) / 10) for i in range(10)
+)
+
+
+def _assert_fields_not_none(snapshot, names):
+    """WHY: Один assert со списком ВСЕХ пропавших метрик вместо падения на первой"""
+    missing = [n for n in names if getattr(snapshot, n) is None]
+    assert not missing, f"❌ Метрики должны быть, но None: {missing}"
+
+
+@pytest.fixture
+def engine():
+    """
+    WHY: Тесты наполняют book (стакан, VPIN, gamma, айсберги, CVD) и FeatureCollector -
+    свежий движок на каждый тест. Сети при конструировании нет
+    (BinanceInfrastructure ходит в сеть только в run()).
+    """
+    return TradingEngine("BTCUSDT", BinanceInfrastructure())
+
 
 class TestFeatureCollectorLobotomyFix:
     """
@@ -39,87 +83,26 @@ class TestFeatureCollectorLobotomyFix:
     3. Количество непустых метрик >= 10 (из 18 общих)
     """
     
-    def test_feature_collector_has_derivatives_analyzer(self):
-        """
-        WHY: Проверяет что derivatives_analyzer подключен.
-        
-        БЫЛО: derivatives_analyzer=None
-        ДОЛЖНО БЫТЬ: derivatives_analyzer=DerivativesAnalyzer()
-        """
-        # Arrange
-        symbol = "BTCUSDT"
-        infra = BinanceInfrastructure()  # FIX: Не принимает аргументы
-        
-        # Act
-        engine = TradingEngine(symbol, infra)
-        
-        # Assert
-        assert engine.feature_collector.derivatives is not None, \
-            "❌ derivatives_analyzer не подключен!"
-        
-        print("✅ derivatives_analyzer подключен")
-    
-    def test_feature_collector_has_spoofing_detector(self):
-        """
-        WHY: Проверяет что spoofing_detector подключен.
-        
-        БЫЛО: spoofing_detector=None
-        ДОЛЖНО БЫТЬ: spoofing_detector=SpoofingAnalyzer()
-        """
-        # Arrange
-        symbol = "BTCUSDT"
-        infra = BinanceInfrastructure()  # FIX
-        
-        # Act
-        engine = TradingEngine(symbol, infra)
-        
-        # Assert
-        assert engine.feature_collector.spoofing is not None, \
-            "❌ spoofing_detector не подключен!"
-        
-        print("✅ spoofing_detector подключен")
-    
-    def test_feature_collector_has_flow_toxicity_analyzer(self):
-        """
-        WHY: Проверяет что flow_toxicity_analyzer подключен.
-        
-        БЫЛО: Не было вообще
-        ДОЛЖНО БЫТЬ: flow_toxicity_analyzer=FlowToxicityAnalyzer()
-        """
-        # Arrange
-        symbol = "BTCUSDT"
-        infra = BinanceInfrastructure()  # FIX
-        
-        # Act
-        engine = TradingEngine(symbol, infra)
-        
-        # Assert
-        assert engine.feature_collector.flow_toxicity is not None, \
-            "❌ flow_toxicity_analyzer не подключен!"
-        
-        print("✅ flow_toxicity_analyzer подключен")
-    
-    def test_feature_collector_has_gamma_provider(self):
+    @pytest.mark.parametrize("attr, was", [
+        pytest.param("derivatives", "derivatives_analyzer=None", id="derivatives_analyzer"),
+        pytest.param("spoofing", "spoofing_detector=None", id="spoofing_detector"),
+        pytest.param("flow_toxicity", "не было вообще", id="flow_toxicity_analyzer"),
+        pytest.param("gamma", "gamma_provider=None", id="gamma_provider"),
+    ])
+    def test_feature_collector_has_dependency(self, engine, attr, was):
         """
-        WHY: Проверяет что gamma_provider подключен.
+        WHY: Проверяет что зависимость FeatureCollector подключена.
         
-        БЫЛО: gamma_provider=None
-        ДОЛЖНО БЫТЬ: gamma_provider=GammaProvider(book)
+        БЫЛО: was (коллектор собирался без анализаторов)
+        ДОЛЖНО БЫТЬ: экземпляр анализатора из TradingEngine
         """
-        # Arrange
-        symbol = "BTCUSDT"
-        infra = BinanceInfrastructure()  # FIX
-        
-        # Act
-        engine = TradingEngine(symbol, infra)
-        
         # Assert
-        assert engine.feature_collector.gamma is not None, \
-            "❌ gamma_provider не подключен!"
+        assert getattr(engine.feature_collector, attr) is not None, \
+            f"❌ {attr} не подключен! (было: {was})"
         
-        print("✅ gamma_provider подключен")
+        print(f"✅ {attr} подключен")
     
-    def test_feature_collector_can_read_order_book(self):
+    def test_feature_collector_can_read_order_book(self, engine):
         """
         WHY: Проверяет что order_book подключен и читается.
         
@@ -127,8 +110,6 @@ class TestFeatureCollectorLobotomyFix:
         """
         # Arrange
         symbol = "BTCUSDT"
-        infra = BinanceInfrastructure()  # FIX
-        engine = TradingEngine(symbol, infra)
         
         # Act
         order_book = engine.feature_collector.order_book
@@ -142,7 +123,7 @@ class TestFeatureCollectorLobotomyFix:
         
         print(f"✅ order_book подключен для {symbol}")
     
-    def test_capture_snapshot_returns_non_null_metrics(self):
+    def test_capture_snapshot_returns_non_null_metrics(self, engine):
         """
         WHY: Проверяет что capture_snapshot() возвращает реальные данные.
         
@@ -155,16 +136,10 @@ class TestFeatureCollectorLobotomyFix:
         Но если ВСЕ метрики None - это проблема "Лоботомии".
         """
         # Arrange
-        symbol = "BTCUSDT"
-        infra = BinanceInfrastructure()  # FIX
-        engine = TradingEngine(symbol, infra)
-        
         # Создаём минимальный стакан для тестирования
         book = engine.book
-        book.bids[Decimal("50000")] = Decimal("1.5")
-        book.bids[Decimal("49900")] = Decimal("2.0")
-        book.asks[Decimal("50100")] = Decimal("1.8")
-        book.asks[Decimal("50200")] = Decimal("2.2")
+        book.bids.update(_MIN_BID_LEVELS)
+        book.asks.update(_MIN_ASK_LEVELS)
         
         # Act
         snapshot = engine.feature_collector.capture_snapshot()
@@ -181,8 +156,8 @@ class TestFeatureCollectorLobotomyFix:
         
         # Считаем количество непустых метрик
         non_null_count = sum(
-            1 for field in snapshot.__dataclass_fields__
-            if getattr(snapshot, field) is not None
+            1 for n in _SNAPSHOT_FIELD_NAMES
+            if getattr(snapshot, n) is not None
         )
         
         # Минимум 5 метрик должны быть заполнены
@@ -195,7 +170,7 @@ class TestFeatureCollectorLobotomyFix:
         print(f"   Spread: {snapshot.spread_bps} bps")
         print(f"   Depth ratio: {snapshot.depth_ratio}")
     
-    def test_cvd_metrics_work_without_flow_analyzer(self):
+    def test_cvd_metrics_work_without_flow_analyzer(self, engine):
         """
         WHY: Проверяет что CVD метрики работают БЕЗ flow_analyzer.
         
@@ -207,11 +182,6 @@ class TestFeatureCollectorLobotomyFix:
         1. Убедиться что flow_analyzer=None
         2. Убедиться что CVD метрики всё равно доступны через book
         """
-        # Arrange
-        symbol = "BTCUSDT"
-        infra = BinanceInfrastructure()  # FIX
-        engine = TradingEngine(symbol, infra)
-        
         # Act & Assert - flow_analyzer должен быть None
         assert engine.feature_collector.flow is None, \
             "flow_analyzer должен быть None (CVD из book.whale_cvd)"
@@ -246,57 +216,20 @@ class TestFeatureCollectorDependencies:
     3. Методы доступны
     """
     
-    def test_derivatives_analyzer_type(self):
-        """Проверяет тип derivatives_analyzer"""
-        from services import TradingEngine
-        from infrastructure import BinanceInfrastructure
-        from analyzers_derivatives import DerivativesAnalyzer
-        
-        engine = TradingEngine("BTCUSDT", BinanceInfrastructure())  # FIX
-        
-        assert isinstance(engine.derivatives_analyzer, DerivativesAnalyzer), \
-            f"❌ Неправильный тип: {type(engine.derivatives_analyzer)}"
-        
-        print("✅ derivatives_analyzer имеет правильный тип")
-    
-    def test_spoofing_analyzer_type(self):
-        """Проверяет тип spoofing_analyzer"""
-        from services import TradingEngine
-        from infrastructure import BinanceInfrastructure
-        from analyzers import SpoofingAnalyzer
-        
-        engine = TradingEngine("BTCUSDT", BinanceInfrastructure())  # FIX
-        
-        assert isinstance(engine.spoofing_analyzer, SpoofingAnalyzer), \
-            f"❌ Неправильный тип: {type(engine.spoofing_analyzer)}"
-        
-        print("✅ spoofing_analyzer имеет правильный тип")
-    
-    def test_flow_toxicity_analyzer_type(self):
-        """Проверяет тип flow_toxicity_analyzer"""
-        from services import TradingEngine
-        from infrastructure import BinanceInfrastructure
-        from analyzers import FlowToxicityAnalyzer
-        
-        engine = TradingEngine("BTCUSDT", BinanceInfrastructure())  # FIX
-        
-        assert isinstance(engine.flow_toxicity_analyzer, FlowToxicityAnalyzer), \
-            f"❌ Неправильный тип: {type(engine.flow_toxicity_analyzer)}"
-        
-        print("✅ flow_toxicity_analyzer имеет правильный тип")
-    
-    def test_gamma_provider_type(self):
-        """Проверяет тип gamma_provider"""
-        from services import TradingEngine
-        from infrastructure import BinanceInfrastructure
-        from analyzers import GammaProvider  # FIX: Теперь в analyzers.py
-        
-        engine = TradingEngine("BTCUSDT", BinanceInfrastructure())  # FIX
-        
-        assert isinstance(engine.gamma_provider, GammaProvider), \
-            f"❌ Неправильный тип: {type(engine.gamma_provider)}"
-        
-        print("✅ gamma_provider имеет правильный тип")
+    @pytest.mark.parametrize("attr, expected_type", [
+        pytest.param("derivatives_analyzer", DerivativesAnalyzer, id="derivatives_analyzer"),
+        pytest.param("spoofing_analyzer", SpoofingAnalyzer, id="spoofing_analyzer"),
+        pytest.param("flow_toxicity_analyzer", FlowToxicityAnalyzer, id="flow_toxicity_analyzer"),
+        pytest.param("gamma_provider", GammaProvider, id="gamma_provider"),
+    ])
+    def test_analyzer_type(self, engine, attr, expected_type):
+        """Проверяет тип анализатора, который движок передаёт в FeatureCollector"""
+        analyzer = getattr(engine, attr)
+        
+        assert isinstance(analyzer, expected_type), \
+            f"❌ Неправильный тип: {type(analyzer)}"
+        
+        print(f"✅ {attr} имеет правильный тип")
 
 
 # ===========================================================================
@@ -322,7 +255,7 @@ class TestFeatureCollectorFullValidation:
     ICEBERG (1): wall_whale_vol
     """
     
-    def test_all_18_metrics_with_minimal_data(self):
+    def test_all_18_metrics_with_minimal_data(self, engine):
         """
         WHY: Проверяет что метрики НЕ падают даже при минимальных данных.
         
@@ -340,90 +273,61 @@ class TestFeatureCollectorFullValidation:
         - Gamma: ❌ None (нет gamma_profile)
         - Iceberg: ✅ (можно рассчитать)
         """
-        from services import TradingEngine
-        from infrastructure import BinanceInfrastructure
-        from decimal import Decimal
-        
         # Arrange
-        engine = TradingEngine("BTCUSDT", BinanceInfrastructure())
         book = engine.book
         
         # Создаём минимальный стакан
-        book.bids[Decimal("50000")] = Decimal("1.5")
-        book.bids[Decimal("49900")] = Decimal("2.0")
-        book.asks[Decimal("50100")] = Decimal("1.8")
-        book.asks[Decimal("50200")] = Decimal("2.2")
+        book.bids.update(_MIN_BID_LEVELS)
+        book.asks.update(_MIN_ASK_LEVELS)
         
         # Act
         snapshot = engine.feature_collector.capture_snapshot()
         
         # Assert - детальная проверка КАЖДОЙ метрики
-        print("\n📊 ДЕТАЛЬНАЯ ПРОВЕРКА 18 МЕТРИК:")
-        print("=" * 60)
-        
-        # === ORDER BOOK (6 метрик) ===
-        print("\n🔵 ORDER BOOK (6):")
-        assert snapshot.spread_bps is not None, "❌ spread_bps должен быть!"
-        print(f"  ✅ spread_bps = {snapshot.spread_bps:.2f}")
-        
-        assert snapshot.obi_value is not None, "❌ obi_20 должен быть!"
-        print(f"  ✅ obi_20 = {snapshot.obi_value:.4f}")
-        
-        assert snapshot.ofi_value is not None, "❌ ofi_20 должен быть!"
-        print(f"  ✅ ofi_20 = {snapshot.ofi_value:.4f}")
-        
-        assert snapshot.current_price is not None, "❌ price должен быть!"
-        print(f"  ✅ price = {snapshot.current_price:.2f}")
-        
-        # bid_depth и ask_depth - используем depth_ratio
-        assert snapshot.depth_ratio is not None, "❌ depth_ratio должен быть!"
-        print(f"  ✅ depth_ratio = {snapshot.depth_ratio:.4f}")
-        
-        # === CVD (3 метрики) ===
-        print("\n🐋 CVD (3):")
-        # CVD могут быть 0.0 (нет сделок), но НЕ None
-        assert snapshot.whale_cvd is not None, "❌ whale_cvd должен быть!"
-        print(f"  ✅ whale_cvd = {snapshot.whale_cvd:.2f}")
-        
-        assert snapshot.fish_cvd is not None, "❌ fish_cvd должен быть!"
-        print(f"  ✅ fish_cvd = {snapshot.fish_cvd:.2f}")
-        
-        assert snapshot.dolphin_cvd is not None, "❌ dolphin_cvd должен быть!"
-        print(f"  ✅ dolphin_cvd = {snapshot.dolphin_cvd:.2f}")
-        
-        # === DERIVATIVES (2 метрики) - ОЖИДАЕМ None ===
-        print("\n📈 DERIVATIVES (2 - Expected None без Deribit):")
-        print(f"  ⚠️ basis_annual = {snapshot.futures_basis_apr} (OK: нет Deribit)")
-        print(f"  ⚠️ skew_25d = {snapshot.options_skew} (OK: нет Deribit)")
-        
-        # === SPOOFING (2 метрики) ===
-        print("\n🎭 SPOOFING (2):")
-        # Могут быть None если нет данных для расчёта, но метод должен работать
-        print(f"  📊 spoofing_score = {snapshot.spoofing_score}")
-        print(f"  📊 cancel_ratio = {snapshot.cancel_ratio_5m}")
-        
-        # === TOXICITY (2 метрики) - ОЖИДАЕМ None ===
-        print("\n☢️ TOXICITY (2 - Expected None без VPIN buckets):")
-        print(f"  ⚠️ vpin = {snapshot.vpin_score} (OK: нет buckets)")
-        print(f"  ⚠️ vpin_level = {snapshot.vpin_level} (OK: нет buckets)")
-        
-        # === GAMMA (2 метрики) - ОЖИДАЕМ None ===
-        print("\n🔮 GAMMA (2 - Expected None без gamma_profile):")
-        print(f"  ⚠️ total_gex = {snapshot.total_gex} (OK: нет gamma)")
-        print(f"  ⚠️ gamma_wall_dist = {snapshot.dist_to_gamma_wall} (OK: нет gamma)")
-        
-        # === ICEBERG - не в snapshot, пропускаем ===
-        
-        print("\n" + "=" * 60)
-        # Подсчитываем non-null через dataclass fields
-        from dataclasses import fields
-        non_null_count = sum(1 for f in fields(snapshot) if getattr(snapshot, f.name) is not None)
-        print(f"✅ ИТОГО: {non_null_count}/{len(fields(snapshot))} метрик доступны")
-        print("✅ Все ORDER BOOK метрики работают")
-        print("✅ Все CVD метрики работают")
-        print("✅ Система стабильна даже без Deribit/VPIN данных")
+        _assert_fields_not_none(snapshot, (
+            # === ORDER BOOK (6 метрик) ===
+            # bid_depth и ask_depth - используем depth_ratio
+            "spread_bps", "obi_value", "ofi_value", "current_price", "depth_ratio",
+            # === CVD (3 метрики) ===
+            # CVD могут быть 0.0 (нет сделок), но НЕ None
+            "whale_cvd", "fish_cvd", "dolphin_cvd",
+        ))
+        
+        # DERIVATIVES/TOXICITY/GAMMA ожидаемо None без Deribit/VPIN/gamma_profile,
+        # SPOOFING может быть None без данных - не проверяем, только в отчёт.
+        # ICEBERG - не в snapshot, пропускаем
+        non_null_count = sum(1 for n in _SNAPSHOT_FIELD_NAMES if getattr(snapshot, n) is not None)
+        
+        logger.debug("\n".join([
+            "📊 ДЕТАЛЬНАЯ ПРОВЕРКА 18 МЕТРИК:",
+            "=" * 60,
+            "🔵 ORDER BOOK (6):",
+            f"  ✅ spread_bps = {snapshot.spread_bps:.2f}",
+            f"  ✅ obi_20 = {snapshot.obi_value:.4f}",
+            f"  ✅ ofi_20 = {snapshot.ofi_value:.4f}",
+            f"  ✅ price = {snapshot.current_price:.2f}",
+            f"  ✅ depth_ratio = {snapshot.depth_ratio:.4f}",
+            "🐋 CVD (3):",
+            f"  ✅ whale_cvd = {snapshot.whale_cvd:.2f}",
+            f"  ✅ fish_cvd = {snapshot.fish_cvd:.2f}",
+            f"  ✅ dolphin_cvd = {snapshot.dolphin_cvd:.2f}",
+            "📈 DERIVATIVES (2 - Expected None без Deribit):",
+            f"  ⚠️ basis_annual = {snapshot.futures_basis_apr} (OK: нет Deribit)",
+            f"  ⚠️ skew_25d = {snapshot.options_skew} (OK: нет Deribit)",
+            "🎭 SPOOFING (2):",
+            f"  📊 spoofing_score = {snapshot.spoofing_score}",
+            f"  📊 cancel_ratio = {snapshot.cancel_ratio_5m}",
+            "☢️ TOXICITY (2 - Expected None без VPIN buckets):",
+            f"  ⚠️ vpin = {snapshot.vpin_score} (OK: нет buckets)",
+            f"  ⚠️ vpin_level = {snapshot.vpin_level} (OK: нет buckets)",
+            "🔮 GAMMA (2 - Expected None без gamma_profile):",
+            f"  ⚠️ total_gex = {snapshot.total_gex} (OK: нет gamma)",
+            f"  ⚠️ gamma_wall_dist = {snapshot.dist_to_gamma_wall} (OK: нет gamma)",
+            "=" * 60,
+            f"✅ ИТОГО: {non_null_count}/{len(_SNAPSHOT_FIELD_NAMES)} метрик доступны",
+        ]))
     
-    def test_snapshot_with_empty_book(self):
+    def test_snapshot_with_empty_book(self, engine):
         """
         WHY: Edge case - пустой стакан при холодном старте.
         
@@ -437,29 +341,17 @@ class TestFeatureCollectorFullValidation:
         - Метрики возвращают None (а не exception)
         - capture_snapshot() завершается успешно
         """
-        from services import TradingEngine
-        from infrastructure import BinanceInfrastructure
-        
         # Arrange - НЕ заполняем стакан
-        engine = TradingEngine("BTCUSDT", BinanceInfrastructure())
         
         # Act - должно пройти БЕЗ exception
-        try:
-            snapshot = engine.feature_collector.capture_snapshot()
-            success = True
-        except Exception as e:
-            success = False
-            error = e
-        
-        # Assert
-        assert success, f"❌ capture_snapshot() упал на пустом стакане: {error}"
+        # WHY: Вызываем напрямую - если упадёт, pytest покажет настоящий traceback
+        snapshot = engine.feature_collector.capture_snapshot()
         
         # Проверяем что ВСЕ метрики None или 0 (но не exception)
         print("\n📊 SNAPSHOT С ПУСТЫМ СТАКАНОМ:")
-        from dataclasses import fields
-        for f in fields(snapshot):
-            value = getattr(snapshot, f.name)
-            print(f"  {f.name}: {value}")
+        for name in _SNAPSHOT_FIELD_NAMES:
+            value = getattr(snapshot, name)
+            print(f"  {name}: {value}")
         
         # Spread должен быть None (нет bid/ask)
         assert snapshot.spread_bps is None, \
@@ -471,7 +363,7 @@ class TestFeatureCollectorFullValidation:
         
         print("✅ Система стабильна при пустом стакане (холодный старт OK)")
     
-    def test_snapshot_with_full_data(self):
+    def test_snapshot_with_full_data(self, engine):
         """
         WHY: Симуляция ПОЛНЫХ данных - максимальное покрытие метрик.
         
@@ -488,21 +380,12 @@ class TestFeatureCollectorFullValidation:
         NOTE: FeatureSnapshot имеет 33 поля, но ~18 из них - future features
               (тренды 1w/1m/3m/6m, режимы и т.д.) которые пока не заполняются.
         """
-        from services import TradingEngine
-        from infrastructure import BinanceInfrastructure
-        from decimal import Decimal
-        from domain import GammaProfile, VolumeBucket, IcebergLevel
-        
         # Arrange
-        engine = TradingEngine("BTCUSDT", BinanceInfrastructure())
         book = engine.book
         
         # === 1. СТАКАН (10 уровней) ===
-        for i in range(10):
-            bid_price = Decimal("50000") - Decimal(str(i * 100))
-            ask_price = Decimal("50100") + Decimal(str(i * 100))
-            book.bids[bid_price] = Decimal("1.5") + Decimal(str(i * 0.1))
-            book.asks[ask_price] = Decimal("1.8") + Decimal(str(i * 0.1))
+        book.bids.update(_FULL_BID_LEVELS)
+        book.asks.update(_FULL_ASK_LEVELS)
         
         # === 2. GAMMA PROFILE (симуляция Deribit) ===
         book.gamma_profile = GammaProfile(
@@ -513,15 +396,16 @@ class TestFeatureCollectorFullValidation:
         
         # === 3. VPIN BUCKETS (симуляция сделок) ===
         # Создаём 20 закрытых корзин для VPIN расчёта
-        for i in range(20):
-            bucket = VolumeBucket(
-                bucket_size=Decimal("10.0"),  # 10 BTC per bucket
-                symbol="BTCUSDT",             # ОБЯЗАТЕЛЬНО
-                buy_volume=Decimal("6.0"),      # 60% покупки
-                sell_volume=Decimal("4.0"),     # 40% продажи
-                is_complete=True                # Корзина заполнена
-            )
-            book.vpin_buckets.append(bucket)
+        # WHY: Корзины одинаковые - аргументы парсим один раз, но экземпляры
+        # отдельные (VolumeBucket мутабелен, общий объект мог бы протечь между корзинами)
+        bucket_kwargs = dict(
+            bucket_size=Decimal("10.0"),  # 10 BTC per bucket
+            symbol="BTCUSDT",             # ОБЯЗАТЕЛЬНО
+            buy_volume=Decimal("6.0"),      # 60% покупки
+            sell_volume=Decimal("4.0"),     # 40% продажи
+            is_complete=True                # Корзина заполнена
+        )
+        book.vpin_buckets.extend(VolumeBucket(**bucket_kwargs) for _ in range(20))
         
         # === 4. АКТИВНЫЕ АЙСБЕРГИ ===
         # Создаём whale айсберг для проверки wall_whale_vol
@@ -545,126 +429,66 @@ class TestFeatureCollectorFullValidation:
         snapshot = engine.feature_collector.capture_snapshot()
         
         # Assert - ВЫСОКИЙ порог для продакшена
-        from dataclasses import fields
-        non_null_count = sum(1 for f in fields(snapshot) if getattr(snapshot, f.name) is not None)
+        non_null_count = sum(1 for n in _SNAPSHOT_FIELD_NAMES if getattr(snapshot, n) is not None)
         
-        print("\n📊 SNAPSHOT С ПОЛНЫМИ ДАННЫМИ:")
-        print("=" * 60)
-        for f in fields(snapshot):
-            value = getattr(snapshot, f.name)
+        # WHY: Отчёт ДО assert - при падении по порогу виден полный состав снапшота
+        report = ["📊 SNAPSHOT С ПОЛНЫМИ ДАННЫМИ:", "=" * 60]
+        for name in _SNAPSHOT_FIELD_NAMES:
+            value = getattr(snapshot, name)
             status = "✅" if value is not None else "❌"
-            print(f"  {status} {f.name}: {value}")
-        print("=" * 60)
+            report.append(f"  {status} {name}: {value}")
+        report.append("=" * 60)
+        logger.debug("\n".join(report))
         
         # КРИТЕРИЙ УСПЕХА для продакшена:
         # WHY: FeatureSnapshot имеет 33 поля, но многие - future features (whale_cvd_trend_1w и т.д.)
         # Реалистичный порог: >= 15 КЛЮЧЕВЫХ метрик (покрывает все категории)
-        total_fields = len(fields(snapshot))
+        total_fields = len(_SNAPSHOT_FIELD_NAMES)
         
         # Проверяем что >= 15 метрик работают (покрывает ORDER BOOK + CVD + GAMMA + VPIN + SPOOFING)
         assert non_null_count >= 15, \
             f"❌ Недостаточно метрик для продакшена: {non_null_count}/{total_fields} (нужно >= 15 ключевых)"
         
-        # Проверяем КЛЮЧЕВЫЕ метрики индивидуально
-        assert snapshot.spread_bps is not None, "❌ spread_bps должен быть!"
-        assert snapshot.obi_value is not None, "❌ obi_20 должен быть!"
-        assert snapshot.whale_cvd is not None, "❌ whale_cvd должен быть!"
-        assert snapshot.total_gex is not None, "❌ total_gex должен быть (есть gamma)!"
-        assert snapshot.dist_to_gamma_wall is not None, "❌ gamma_wall_dist должен быть!"
-        assert snapshot.vpin_score is not None, "❌ vpin должен быть (есть buckets)!"
-        
-        print(f"\n✅ ПРОДАКШЕН ГОТОВ: {non_null_count}/{total_fields} метрик работают ({non_null_count/total_fields*100:.1f}%)")
-        print("✅ Ключевые метрики доступны: ORDER BOOK, CVD, GAMMA, VPIN, SPOOFING")
-        print("✅ Порог для продакшена пройден (>= 15 ключевых)")
+        # Проверяем КЛЮЧЕВЫЕ метрики индивидуально (gamma и VPIN - данные есть)
+        _assert_fields_not_none(snapshot, (
+            "spread_bps", "obi_value", "whale_cvd",
+            "total_gex", "dist_to_gamma_wall", "vpin_score",
+        ))
+        
+        logger.debug(
+            f"✅ ПРОДАКШЕН ГОТОВ: {non_null_count}/{total_fields} метрик работают "
+            f"({non_null_count/total_fields*100:.1f}%)"
+        )
     
-    def test_throttling_prevents_db_overload(self):
+    def test_throttling_prevents_db_overload(self, engine):
         """
         WHY: Gemini рекомендация - предотвращаем перегрузку БД при лавинообразных рефиллах.
         
-        Сценарий:
-        - Айсберг рефиллится 10 раз за 50 мс (лавинообразный поток сделок)
-        - Без throttling: 10 записей в БД за 50 мс → перегрузка
-        - С throttling: только 1 запись (остальные возвращают кешированный снапшот)
+        Throttling перенесён из FeatureCollector в services layer:
+        снапшот собирается на каждый рефилл, TradingEngine._should_write_db()
+        пропускает в БД не чаще одной записи за 100 мс.
         
         Проверяем:
-        1. Первый вызов создает новый снапшот
-        2. Повторные вызовы < 100 мс возвращают тот же объект (кеш)
-        3. Вызов через >= 100 мс создает новый снапшот
+        1. Первая запись разрешена
+        2. Повторная < 100 мс - отклонена
+        3. Через >= 100 мс от последней записи - снова разрешена
+        4. Лавина (10 рефиллов за 50 мс) даёт ровно 1 запись
         """
-        import time
-        from datetime import datetime, timezone
-        from services import TradingEngine
-        from infrastructure import BinanceInfrastructure
+        # WHY: Время передаём аргументом и двигаем вручную - тест не ждёт реальные мс
+        t0 = 1_700_000_000.0
         
-        # Arrange
-        engine = TradingEngine("BTCUSDT", BinanceInfrastructure())
-        book = engine.book
+        assert engine._should_write_db(t0) is True, "❌ Первая запись должна пройти"
+        assert engine._should_write_db(t0 + 0.05) is False, \
+            "❌ Throttling НЕ работает! Запись через 50 мс должна быть отклонена"
+        assert engine._should_write_db(t0 + 0.15) is True, \
+            "❌ Через 150 мс от первой записи throttle должен пропустить"
+        assert engine.last_db_write_time == t0 + 0.15, "❌ last_db_write_time не обновился!"
+        
+        # Лавинообразный рефилл: 10 вызовов с шагом 5 мс, начиная через 150 мс
+        flood_start = t0 + 0.3
+        writes = sum(engine._should_write_db(flood_start + i * 0.005) for i in range(10))
+        
+        assert writes == 1, \
+            f"❌ Throttling не предотвратил перегрузку! {writes} записей вместо 1"
         
-        # Минимальный стакан
-        book.bids[Decimal("50000")] = Decimal("1.0")
-        book.asks[Decimal("50100")] = Decimal("1.0")
-        
-        # Act 1: Первый снапшот (холодный старт)
-        snapshot1 = engine.feature_collector.capture_snapshot()
-        time1 = engine.feature_collector._last_snapshot_time
-        
-        # Act 2: Второй снапшот через 50 мс (слишком рано!)
-        time.sleep(0.05)  # 50 мс
-        snapshot2 = engine.feature_collector.capture_snapshot()
-        
-        # Assert: snapshot2 должен быть ТОТ ЖЕ объект (кеш)
-        assert snapshot2 is snapshot1, \
-            "❌ Throttling НЕ работает! Должен возвращаться кешированный объект при < 100 мс"
-        
-        print("\n⏱️  THROTTLING ТЕСТ:")
-        print("=" * 60)
-        print(f"  ✅ Вызов #1 (0 мс): Новый снапшот создан")
-        print(f"  ✅ Вызов #2 (50 мс): Кеш возвращен (тот же объект)")
-        print(f"     → snapshot2 is snapshot1: {snapshot2 is snapshot1}")
-        
-        # Act 3: Третий снапшот через 150 мс (достаточно времени)
-        time.sleep(0.1)  # Еще 100 мс (всего 150 мс от начала)
-        snapshot3 = engine.feature_collector.capture_snapshot()
-        
-        # Assert: snapshot3 должен быть НОВЫЙ объект
-        assert snapshot3 is not snapshot1, \
-            "❌ Throttling работает неправильно! Через 150 мс должен создаться новый снапшот"
-        
-        # Проверяем что время обновилось
-        time3 = engine.feature_collector._last_snapshot_time
-        assert time3 > time1, "❌ _last_snapshot_time не обновился!"
-        
-        # Проверяем что кеш обновился на snapshot3
-        assert engine.feature_collector._last_snapshot_cache is snapshot3, \
-            "❌ Кеш должен указывать на последний снапшот!"
-        
-        print(f"  ✅ Вызов #3 (150 мс): Новый снапшот создан")
-        print(f"     → snapshot3 is not snapshot1: {snapshot3 is not snapshot1}")
-        print("=" * 60)
-        
-        # Act 4: Симуляция лавинообразных рефиллов (10 вызовов за 50 мс)
-        snapshot_flood_start = engine.feature_collector.capture_snapshot()
-        time.sleep(0.15)  # Сброс throttle
-        
-        flood_results = []
-        for i in range(10):
-            s = engine.feature_collector.capture_snapshot()
-            flood_results.append(s)
-            time.sleep(0.005)  # 5 мс между вызовами
-        
-        # Проверяем что ВСЕ 10 вызовов вернули ТОТ ЖЕ объект
-        unique_snapshots = len(set(id(s) for s in flood_results))
-        
-        print(f"\n🌊 ЛАВИНООБРАЗНЫЙ РЕФИЛЛ (10 вызовов за 50 мс):")
-        print("=" * 60)
-        print(f"  Уникальных снапшотов создано: {unique_snapshots}")
-        print(f"  Ожидается: 1 (все остальные из кеша)")
-        
-        # В идеале должен быть только 1 уникальный объект
-        # Но допускаем до 2-3 из-за возможных race conditions в sleep
-        assert unique_snapshots <= 3, \
-            f"❌ Throttling не предотвратил перегрузку! Создано {unique_snapshots} снапшотов вместо ~1"
-        
-        print(f"  ✅ Throttling предотвратил {10 - unique_snapshots} лишних записей в БД!")
-        print("  ✅ БД защищена от перегрузки при лавинообразных событиях")
-        print("=" * 60)
+        print(f"\n🌊 ЛАВИНООБРАЗНЫЙ РЕФИЛЛ: {writes} запись из 10 рефиллов")
@@ -3,13 +3,25 @@ WHY: Упрощённые тесты для Market Metrics Logging (Gemini Phase
 
 Mock-based тесты без реальной БД для проверки логики.
 """
+import ast
 import pytest
 from decimal import Decimal
-from datetime import datetime
+from datetime import datetime, timedelta
+from pathlib import Path
 from domain import LocalOrderBook, OrderBookUpdate
 from config import BTC_CONFIG
 
 
+# WHY: Тесты не проверяют ход времени - фиксированная метка вместо
+# datetime.now() на каждую строку метрик (детерминированно, без системных вызовов)
+_TS0 = datetime(2024, 1, 1)
+
+# WHY: Decimal неизменяем - парсим повторяющиеся литералы один раз на модуль
+_PX_100K = Decimal("100000")
+# Объём bid растёт 5.0 → 9.5 шагом 0.5 - по значению на каждый update batch-теста
+_BATCH_QTYS = tuple(Decimal("5.0") + Decimal("0.5") * i for i in range(10))
+
+
 def test_metric_collection_from_orderbook():
     """
     WHY: Проверяем что можем собрать все необходимые метрики из книги.
@@ -83,7 +95,7 @@ def test_metrics_structure():
     # Формируем словарь метрик
     metrics = {
         'symbol': 'ETHUSDT',
-        'timestamp': datetime.now(),
+        'timestamp': _TS0,
         'mid_price': book.get_mid_price(),
         'ofi': book.calculate_ofi(),
         'obi': book.get_weighted_obi(use_exponential=True),
@@ -104,9 +116,12 @@ def test_metrics_structure():
     assert isinstance(metrics['spread_bps'], (float, Decimal))  # Может быть и Decimal
 
 
-def test_mock_repository_logging():
+async def test_mock_repository_logging():
     """
     WHY: Mock тест - проверяем что метод вызывается с корректными параметрами.
+    
+    Async-тест на общем session loop (pytest-asyncio auto) - без asyncio.run()
+    и создания отдельного event loop ради одного await.
     """
     # Mock repository
     class MockRepo:
@@ -119,19 +134,14 @@ def test_mock_repository_logging():
     repo = MockRepo()
     
     # Симулируем логирование
-    import asyncio
-    
-    async def simulate_logging():
-        await repo.log_market_metrics(
-            symbol='BTCUSDT',
-            timestamp=datetime.now(),
-            mid_price=Decimal('100000.50'),
-            ofi=2.5,
-            obi=0.75,
-            spread_bps=10.5
-        )
-    
-    asyncio.run(simulate_logging())
+    await repo.log_market_metrics(
+        symbol='BTCUSDT',
+        timestamp=_TS0,
+        mid_price=Decimal('100000.50'),
+        ofi=2.5,
+        obi=0.75,
+        spread_bps=10.5
+    )
     
     # Проверяем
     assert len(repo.logged_metrics) == 1
@@ -171,7 +181,7 @@ def test_handle_none_values():
     # Можно логировать с OFI=0.0
     metrics = {
         'symbol': 'BTCUSDT',
-        'timestamp': datetime.now(),
+        'timestamp': _TS0,
         'mid_price': mid_price,
         'ofi': ofi,  # 0.0
         'obi': book.get_weighted_obi(use_exponential=True),
@@ -235,7 +245,7 @@ def test_batch_metrics_collection():
     # 10 updates
     for i in range(10):
         book.apply_update(OrderBookUpdate(
-            bids=[(Decimal("100000"), Decimal(str(5.0 + i * 0.5)))],
+            bids=[(_PX_100K, _BATCH_QTYS[i])],
             asks=[],
             first_update_id=i+2,
             final_update_id=i+2,
@@ -244,7 +254,7 @@ def test_batch_metrics_collection():
         
         # Собираем метрики
         metrics_history.append({
-            'timestamp': datetime.now(),
+            'timestamp': _TS0 + timedelta(seconds=i),
             'ofi': book.calculate_ofi(),
             'obi': book.get_weighted_obi(use_exponential=True)
         })
@@ -267,15 +277,27 @@ def test_repository_method_signature():
     WHY: Проверяем сигнатуру метода log_market_metrics.
     
     Метод должен принимать все необходимые параметры.
+    Статическая проверка по AST - repository (asyncpg и т.п.) не импортируем.
     """
-    # Проверяем что метод существует в repository
-    from repository import PostgresRepository
+    source = (Path(__file__).resolve().parent.parent / "repository.py").read_text(encoding="utf-8")
+    
+    repo_class = next(
+        (node for node in ast.parse(source).body
+         if isinstance(node, ast.ClassDef) and node.name == "PostgresRepository"),
+        None
+    )
+    assert repo_class is not None, "FAIL: Класс PostgresRepository не найден в repository.py"
     
     # Метод должен существовать в классе
-    assert hasattr(PostgresRepository, 'log_market_metrics'), \
+    method = next(
+        (node for node in repo_class.body
+         if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+         and node.name == "log_market_metrics"),
+        None
+    )
+    assert method is not None, \
         "FAIL: Метод log_market_metrics не найден в PostgresRepository"
     
     # Проверяем что это async метод
-    import inspect
-    assert inspect.iscoroutinefunction(PostgresRepository.log_market_metrics), \
+    assert isinstance(method, ast.AsyncFunctionDef), \
         "FAIL: log_market_metrics должен быть async методом"
@@ -22,6 +22,28 @@ from decimal import Decimal
 from domain import LocalOrderBook, OrderBookUpdate
 
 
+# WHY: 30 уровней для depth-теста парсим один раз при импорте модуля
+_DEPTH_BIDS = tuple((Decimal(f"60000.{i:02d}"), Decimal("1.0")) for i in range(30))
+_DEPTH_ASKS = tuple((Decimal(f"60100.{i:02d}"), Decimal("1.0")) for i in range(30))
+
+
+@pytest.fixture
+def book():
+    """
+    WHY: Канонический стакан OFI-тестов: bid 60000 x 10.0, ask 60100 x 5.0.
+    Свежий на каждый тест - тесты мутируют стакан и previous_*_snapshot.
+    NOTE: Сборка (~90µs) дешевле copy.deepcopy() готовой книги (~400µs) -
+    pydantic-модель копирует config, deque и SortedDict поштучно.
+    """
+    book = LocalOrderBook(symbol="BTCUSDT")
+    book.apply_snapshot(
+        bids=[(Decimal("60000"), Decimal("10.0"))],
+        asks=[(Decimal("60100"), Decimal("5.0"))],
+        last_update_id=100
+    )
+    return book
+
+
 # ===========================================================================
 # ТЕСТЫ _save_book_snapshot()
 # ===========================================================================
@@ -54,10 +76,7 @@ def test_save_snapshot_depth_limit():
     book = LocalOrderBook(symbol="BTCUSDT")
     
     # Создаем 30 уровней
-    bids = [(Decimal(f"60000.{i:02d}"), Decimal("1.0")) for i in range(30)]
-    asks = [(Decimal(f"60100.{i:02d}"), Decimal("1.0")) for i in range(30)]
-    
-    book.apply_snapshot(bids=bids, asks=asks, last_update_id=100)
+    book.apply_snapshot(bids=_DEPTH_BIDS, asks=_DEPTH_ASKS, last_update_id=100)
     
     # Сохраняем только топ-10
     book._save_book_snapshot(depth=10)
@@ -71,150 +90,47 @@ def test_save_snapshot_depth_limit():
 # ТЕСТЫ calculate_ofi() - БАЗОВЫЕ СЛУЧАИ
 # ===========================================================================
 
-def test_ofi_no_change():
-    """WHY: OFI = 0 когда стакан не изменился"""
-    book = LocalOrderBook(symbol="BTCUSDT")
-    
-    book.apply_snapshot(
-        bids=[(Decimal("60000"), Decimal("10.0"))],
-        asks=[(Decimal("60100"), Decimal("5.0"))],
-        last_update_id=100
-    )
-    
-    # Сохраняем снапшот
+@pytest.mark.parametrize("bids, asks, expected_ofi", [
+    # Пустое обновление - стакан не изменился
+    pytest.param([], [], 0.0, id="no_change"),
+    # Bid 10 → 15: добавили bid ликвидность
+    pytest.param([("60000", "15.0")], [], 5.0, id="bid_increase"),
+    # Ask 5 → 8: добавили ask ликвидность
+    pytest.param([], [("60100", "8.0")], -3.0, id="ask_increase"),
+    # Bid 10 → 6: отмена bid
+    pytest.param([("60000", "6.0")], [], -4.0, id="bid_decrease"),
+    # Ask 5 → 3: отмена ask
+    pytest.param([], [("60100", "3.0")], 2.0, id="ask_decrease"),
+    # qty=0 удаляет уровень 60000 целиком
+    pytest.param([("60000", "0")], [], -10.0, id="level_deletion"),
+    # Новый уровень 59998
+    pytest.param([("59998", "7.0")], [], 7.0, id="new_level_addition"),
+    # Bid +3, Ask +2 одновременно: OFI = +3 - (+2)
+    pytest.param([("60000", "13.0")], [("60100", "7.0")], 1.0, id="complex_scenario"),
+])
+def test_ofi_single_update(book, bids, asks, expected_ofi):
+    """WHY: OFI = Δ(bid_volume) - Δ(ask_volume) после одного update"""
     book._save_book_snapshot()
     
-    # Применяем пустое обновление
     update = OrderBookUpdate(
         first_update_id=101,
         final_update_id=102,
-        bids=[],
-        asks=[],
+        bids=[(Decimal(price), Decimal(qty)) for price, qty in bids],
+        asks=[(Decimal(price), Decimal(qty)) for price, qty in asks],
         event_time=1234567890000  # WHY: Required field
     )
     book.apply_update(update)
     
     ofi = book.calculate_ofi()
-    assert ofi == 0.0, f"Expected OFI=0.0, got {ofi}"
-
-
-def test_ofi_bid_increase():
-    """WHY: Положительный OFI при добавлении bid ликвидности"""
-    book = LocalOrderBook(symbol="BTCUSDT")
-    
-    book.apply_snapshot(
-        bids=[(Decimal("60000"), Decimal("10.0"))],
-        asks=[(Decimal("60100"), Decimal("5.0"))],
-        last_update_id=100
-    )
-    book._save_book_snapshot()
-    
-    # Добавляем 5 BTC на bid
-    update = OrderBookUpdate(
-        first_update_id=101,
-        final_update_id=102,
-        bids=[(Decimal("60000"), Decimal("15.0"))],  # Было 10, стало 15
-        asks=[],
-        event_time=1234567890000
-    )
-    book.apply_update(update)
-    
-    ofi = book.calculate_ofi()
-    assert ofi > 0, f"Expected positive OFI, got {ofi}"
-    assert abs(ofi - 5.0) < 0.01, f"Expected OFI≈5.0, got {ofi}"
-
-
-def test_ofi_ask_increase():
-    """WHY: Отрицательный OFI при добавлении ask ликвидности"""
-    book = LocalOrderBook(symbol="BTCUSDT")
-    
-    book.apply_snapshot(
-        bids=[(Decimal("60000"), Decimal("10.0"))],
-        asks=[(Decimal("60100"), Decimal("5.0"))],
-        last_update_id=100
-    )
-    book._save_book_snapshot()
-    
-    # Добавляем 3 BTC на ask
-    update = OrderBookUpdate(
-        first_update_id=101,
-        final_update_id=102,
-        bids=[],
-        asks=[(Decimal("60100"), Decimal("8.0"))],  # Было 5, стало 8
-        event_time=1234567890000
-    )
-    book.apply_update(update)
-    
-    ofi = book.calculate_ofi()
-    assert ofi < 0, f"Expected negative OFI, got {ofi}"
-    assert abs(ofi + 3.0) < 0.01, f"Expected OFI≈-3.0, got {ofi}"
-
-
-def test_ofi_bid_decrease():
-    """WHY: Отрицательный OFI при удалении bid ликвидности (отмена)"""
-    book = LocalOrderBook(symbol="BTCUSDT")
-    
-    book.apply_snapshot(
-        bids=[(Decimal("60000"), Decimal("10.0"))],
-        asks=[(Decimal("60100"), Decimal("5.0"))],
-        last_update_id=100
-    )
-    book._save_book_snapshot()
-    
-    # Убираем 4 BTC с bid
-    update = OrderBookUpdate(
-        first_update_id=101,
-        final_update_id=102,
-        bids=[(Decimal("60000"), Decimal("6.0"))],  # Было 10, стало 6
-        asks=[],
-        event_time=1234567890000
-    )
-    book.apply_update(update)
-    
-    ofi = book.calculate_ofi()
-    assert ofi < 0, f"Expected negative OFI (bid removal), got {ofi}"
-    assert abs(ofi + 4.0) < 0.01, f"Expected OFI≈-4.0, got {ofi}"
-
-
-def test_ofi_ask_decrease():
-    """WHY: Положительный OFI при удалении ask ликвидности (отмена)"""
-    book = LocalOrderBook(symbol="BTCUSDT")
-    
-    book.apply_snapshot(
-        bids=[(Decimal("60000"), Decimal("10.0"))],
-        asks=[(Decimal("60100"), Decimal("5.0"))],
-        last_update_id=100
-    )
-    book._save_book_snapshot()
-    
-    # Убираем 2 BTC с ask
-    update = OrderBookUpdate(
-        first_update_id=101,
-        final_update_id=102,
-        bids=[],
-        asks=[(Decimal("60100"), Decimal("3.0"))],  # Было 5, стало 3
-        event_time=1234567890000
-    )
-    book.apply_update(update)
-    
-    ofi = book.calculate_ofi()
-    assert ofi > 0, f"Expected positive OFI (ask removal), got {ofi}"
-    assert abs(ofi - 2.0) < 0.01, f"Expected OFI≈2.0, got {ofi}"
+    assert abs(ofi - expected_ofi) < 0.01, f"Expected OFI≈{expected_ofi}, got {ofi}"
 
 
 # ===========================================================================
 # ТЕСТЫ calculate_ofi() - EDGE CASES
 # ===========================================================================
 
-def test_ofi_first_update():
+def test_ofi_first_update(book):
     """WHY: Первый update без предыдущего состояния должен вернуть 0"""
-    book = LocalOrderBook(symbol="BTCUSDT")
-    
-    book.apply_snapshot(
-        bids=[(Decimal("60000"), Decimal("10.0"))],
-        asks=[(Decimal("60100"), Decimal("5.0"))],
-        last_update_id=100
-    )
     
     # НЕ сохраняем снапшот - имитируем первый update
     
@@ -222,96 +138,8 @@ def test_ofi_first_update():
     assert ofi == 0.0, f"Expected OFI=0.0 for first update, got {ofi}"
 
 
-def test_ofi_level_deletion():
-    """WHY: Удаление ценового уровня (qty=0) должно учитываться"""
-    book = LocalOrderBook(symbol="BTCUSDT")
-    
-    book.apply_snapshot(
-        bids=[(Decimal("60000"), Decimal("10.0")), (Decimal("59999"), Decimal("5.0"))],
-        asks=[(Decimal("60100"), Decimal("5.0"))],
-        last_update_id=100
-    )
-    book._save_book_snapshot()
-    
-    # Удаляем уровень 60000 (qty=0)
-    update = OrderBookUpdate(
-        first_update_id=101,
-        final_update_id=102,
-        bids=[(Decimal("60000"), Decimal("0"))],  # Удаление!
-        asks=[],
-        event_time=1234567890000
-    )
-    book.apply_update(update)
-    
-    ofi = book.calculate_ofi()
-    # Удалили 10 BTC bid → OFI = -10.0
-    assert ofi < 0, f"Expected negative OFI, got {ofi}"
-    assert abs(ofi + 10.0) < 0.01, f"Expected OFI≈-10.0, got {ofi}"
-
-
-def test_ofi_new_level_addition():
-    """WHY: Появление нового ценового уровня"""
-    book = LocalOrderBook(symbol="BTCUSDT")
-    
-    book.apply_snapshot(
-        bids=[(Decimal("60000"), Decimal("10.0"))],
-        asks=[(Decimal("60100"), Decimal("5.0"))],
-        last_update_id=100
-    )
-    book._save_book_snapshot()
-    
-    # Добавляем новый уровень 59998
-    update = OrderBookUpdate(
-        first_update_id=101,
-        final_update_id=102,
-        bids=[(Decimal("59998"), Decimal("7.0"))],  # Новый уровень!
-        asks=[],
-        event_time=1234567890000
-    )
-    book.apply_update(update)
-    
-    ofi = book.calculate_ofi()
-    # Добавили 7 BTC bid → OFI = +7.0
-    assert ofi > 0, f"Expected positive OFI, got {ofi}"
-    assert abs(ofi - 7.0) < 0.01, f"Expected OFI≈7.0, got {ofi}"
-
-
-def test_ofi_complex_scenario():
-    """WHY: Комплексный сценарий - одновременные изменения bid и ask"""
-    book = LocalOrderBook(symbol="BTCUSDT")
-    
-    book.apply_snapshot(
-        bids=[(Decimal("60000"), Decimal("10.0"))],
-        asks=[(Decimal("60100"), Decimal("5.0"))],
-        last_update_id=100
-    )
-    book._save_book_snapshot()
-    
-    # Bid +3 BTC, Ask +2 BTC
-    update = OrderBookUpdate(
-        first_update_id=101,
-        final_update_id=102,
-        bids=[(Decimal("60000"), Decimal("13.0"))],  # +3
-        asks=[(Decimal("60100"), Decimal("7.0"))],   # +2
-        event_time=1234567890000
-    )
-    book.apply_update(update)
-    
-    ofi = book.calculate_ofi()
-    # OFI = +3 (bid) - (+2) (ask) = +1.0
-    assert ofi > 0, f"Expected positive OFI, got {ofi}"
-    assert abs(ofi - 1.0) < 0.01, f"Expected OFI≈1.0, got {ofi}"
-
-
-def test_ofi_sequential_updates():
+def test_ofi_sequential_updates(book):
     """WHY: Проверка что OFI корректно обновляется при последовательных updates"""
-    book = LocalOrderBook(symbol="BTCUSDT")
-    
-    book.apply_snapshot(
-        bids=[(Decimal("60000"), Decimal("10.0"))],
-        asks=[(Decimal("60100"), Decimal("5.0"))],
-        last_update_id=100
-    )
     book._save_book_snapshot()
     
     # Update 1: Bid +5
@@ -353,7 +181,7 @@ def test_ofi_sequential_updates():
 # ИНТЕГРАЦИОННЫЕ ТЕСТЫ
 # ===========================================================================
 
-def test_ofi_integration_iceberg_scenario():
+def test_ofi_integration_iceberg_scenario(book):
     """
     WHY: Интеграционный тест - сценарий детекции айсберга через OFI
     
@@ -363,14 +191,6 @@ def test_ofi_integration_iceberg_scenario():
     3. OFI должен показать отрицательное значение (добавление ask ликвидности)
     4. Это сигнал Sell Iceberg!
     """
-    book = LocalOrderBook(symbol="BTCUSDT")
-    
-    # Начальное состояние
-    book.apply_snapshot(
-        bids=[(Decimal("60000"), Decimal("10.0"))],
-        asks=[(Decimal("60100"), Decimal("5.0"))],  # Видимо только 5 BTC
-        last_update_id=100
-    )
     book._save_book_snapshot()
     
     # Сделка съедает 8 BTC, но видно было только 5
@@ -144,3 +144,35 @@ def test_multiple_reconnects():
         ofi = book.calculate_ofi()
         assert abs(ofi - 0.5) < 0.2, \
             f"FAIL на итерации {i}: OFI={ofi}, ожидали ~0.5"
+
+
+def test_ofi_is_zero_right_after_reconnect():
+    """
+    WHY: Между новым snapshot и первым update изменений стакана нет.
+    calculate_ofi() должен вернуть ровно 0.0, а не дельту к стакану до разрыва.
+    """
+    book = LocalOrderBook(symbol="BTCUSDT", config=BTC_CONFIG)
+    
+    book.apply_snapshot(
+        [(Decimal("100000"), Decimal("1.0"))],
+        [(Decimal("100010"), Decimal("1.0"))],
+        last_update_id=100
+    )
+    book.apply_update(OrderBookUpdate(
+        bids=[(Decimal("100000"), Decimal("3.0"))],
+        asks=[],
+        first_update_id=101,
+        final_update_id=101,
+        event_time=1000
+    ))
+    assert book.calculate_ofi() != 0.0
+    
+    # RECONNECT → новый snapshot, update ещё не пришёл
+    book.apply_snapshot(
+        [(Decimal("99000"), Decimal("5.0"))],
+        [(Decimal("99010"), Decimal("3.0"))],
+        last_update_id=200
+    )
+    
+    assert book.calculate_ofi() == 0.0
+    assert book.calculate_ofi(use_weighted=True) == 0.0
@@ -15,7 +15,8 @@ WHY: Уязвимость Б (Gemini Validation) - L1 Bias / No Decay
 import pytest
 from decimal import Decimal
 from domain import LocalOrderBook, OrderBookUpdate
-from config import AssetConfig
+from dataclasses import replace
+from config import AssetConfig, get_config
 
 
 class TestWeightedOFI:
@@ -91,8 +92,10 @@ class TestWeightedOFI:
         - ETH: λ=0.15 (быстрое затухание, более волатилен)
         """
         # BTC Book (λ=0.1)
-        book_btc = LocalOrderBook(symbol='BTCUSDT')
-        book_btc.config.lambda_decay = 0.1
+        book_btc = LocalOrderBook(
+            symbol='BTCUSDT',
+            config=replace(get_config('BTCUSDT'), lambda_decay=0.1)
+        )
         
         book_btc.apply_snapshot(bids=[], asks=[], last_update_id=100)
         
@@ -109,8 +112,10 @@ class TestWeightedOFI:
         ofi_btc = book_btc.calculate_ofi(depth=20, use_weighted=True)
         
         # ETH Book (λ=0.15 - более агрессивное затухание)
-        book_eth = LocalOrderBook(symbol='ETHUSDT')
-        book_eth.config.lambda_decay = 0.15
+        book_eth = LocalOrderBook(
+            symbol='ETHUSDT',
+            config=replace(get_config('ETHUSDT'), lambda_decay=0.15)
+        )
         
         book_eth.apply_snapshot(bids=[], asks=[], last_update_id=100)
         